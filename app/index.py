@@ -1,5 +1,6 @@
 import dash
-from dash import dcc, html, dash_table
+import flask
+from dash import dcc, html, dash_table, Patch
 from dash.dependencies import Input, Output, State
 import plotly.graph_objects as go
 import pandas as pd
@@ -9,13 +10,46 @@ import base64
 from datetime import datetime, timedelta
 import numpy as np
 import zipfile
+from array import array
+import os
+import tempfile
 from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, Flowable, PageBreak
+from reportlab.lib.utils import ImageReader
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 import plotly.io as pio
 import json
+import math
+import socket
+import sys
+import time
+import threading
+import hashlib
+import hmac
+import mimetypes
+import secrets
+import tracemalloc
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial, wraps
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    import resource
+except ImportError:
+    resource = None
 
 app = dash.Dash(__name__, external_stylesheets=[
     'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0-beta3/css/all.min.css'
@@ -33,6 +67,102 @@ if isinstance(firebase_config, str):
         print("Warning: __firebase_config is a string but not valid JSON. Using empty dict.")
         firebase_config = {}
 
+MEMORY_PROFILE_DIR = os.environ.get('POTS_MEMORY_PROFILE_DIR')
+LIVE_STREAM_SOURCE = os.environ.get('POTS_LIVE_SOURCE')
+LIVE_VIEW_INTERVAL_MS = 2000
+LIVE_VIEW_MAX_POINTS = 3600
+LIVE_EVENTS_MAX = 500
+LIVE_HISTORY_SAMPLES = 20_000
+LIVE_DETECTORS_MAX = 4
+MEMORY_PROFILE_TOP_SITES = 10
+_memory_profile_state = threading.local()
+_memory_profile_lock = threading.Lock()
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _finish_profile_stage(state):
+    stage, state.stage = state.stage, None
+    if stage is None:
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    state.peak = max(state.peak, peak)
+    stage.update({
+        'peak_increase_bytes': peak - stage.pop('_start_bytes'),
+        'retained_bytes': current - state.baseline,
+        'peak_rss_bytes': peak_rss_bytes()
+    })
+    start_snapshot = stage.pop('_snapshot')
+    if start_snapshot is not None:
+        top_stats = tracemalloc.take_snapshot().compare_to(start_snapshot, 'lineno')[:state.top_sites]
+        stage['top_allocations'] = [
+            {'site': str(stat.traceback), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+            for stat in top_stats
+        ]
+    state.report['stages'].append(stage)
+
+def profile_stage(name):
+    state = _memory_profile_state
+    if getattr(state, 'report', None) is None:
+        return
+    _finish_profile_stage(state)
+    current, peak = tracemalloc.get_traced_memory()
+    state.peak = max(state.peak, peak)
+    snapshot = tracemalloc.take_snapshot() if state.top_sites else None
+    tracemalloc.reset_peak()
+    state.stage = {'stage': name, '_start_bytes': tracemalloc.get_traced_memory()[0], '_snapshot': snapshot}
+
+@contextmanager
+def memory_profile(request_name, report_dir=None, top_sites=MEMORY_PROFILE_TOP_SITES):
+    state = _memory_profile_state
+    if getattr(state, 'report', None) is not None:
+        yield state.report
+        return
+    with _memory_profile_lock:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        state.report = {'request': request_name, 'started_at': datetime.now().isoformat(), 'stages': []}
+        state.stage = None
+        state.top_sites = top_sites
+        state.baseline = tracemalloc.get_traced_memory()[0]
+        state.peak = state.baseline
+        report = state.report
+        try:
+            yield report
+        finally:
+            try:
+                _finish_profile_stage(state)
+                current, peak = tracemalloc.get_traced_memory()
+                report.update({
+                    'peak_traced_bytes': max(state.peak, peak) - state.baseline,
+                    'retained_bytes': current - state.baseline,
+                    'peak_rss_bytes': peak_rss_bytes()
+                })
+            finally:
+                state.report = None
+                state.stage = None
+                if started_tracing:
+                    tracemalloc.stop()
+            if report_dir:
+                os.makedirs(report_dir, exist_ok=True)
+                report_path = os.path.join(report_dir, f"{request_name}-{datetime.now():%Y%m%dT%H%M%S%f}.json")
+                with open(report_path, 'w') as f:
+                    json.dump(report, f, indent=2)
+
+def profile_memory(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not MEMORY_PROFILE_DIR:
+            return func(*args, **kwargs)
+        with memory_profile(func.__name__, MEMORY_PROFILE_DIR):
+            return func(*args, **kwargs)
+    return wrapper
+
 app.layout = html.Div(className="min-h-screen bg-gray-100 dark:bg-gray-900 text-gray-900 dark:text-gray-100 transition-colors duration-300 font-inter", children=[
     html.Div(className="container mx-auto p-6", children=[
         html.H1("POTS Screener", className="text-4xl font-bold text-center mb-6 text-indigo-700 dark:text-indigo-400"),
@@ -150,7 +280,34 @@ app.layout = html.Div(className="min-h-screen bg-gray-100 dark:bg-gray-900 text-
                             export_headers='display'
                         ),
                         html.Button("Download Summary as CSV", id="btn-download-csv", className="mt-4 px-4 py-2 bg-indigo-500 text-white rounded-lg shadow-md hover:bg-indigo-600 transition-colors duration-200"),
-                        dcc.Download(id="download-csv")
+                        dcc.Download(id="download-csv"),
+                        html.Div(className="mt-4", children=[
+                            html.Label("Event Export Format", className="block text-sm font-medium mb-2 text-gray-700 dark:text-gray-300"),
+                            dcc.RadioItems(
+                                id='event-export-format',
+                                options=[
+                                    {'label': ' Parquet', 'value': 'parquet', 'disabled': pa is None},
+                                    {'label': ' Feather', 'value': 'feather', 'disabled': pa is None},
+                                    {'label': ' CSV', 'value': 'csv'}
+                                ],
+                                value='parquet' if pa is not None else 'csv',
+                                inline=True,
+                                className="text-sm text-gray-700 dark:text-gray-300"
+                            ),
+                            html.P(
+                                "Parquet and Feather exports need pyarrow, which is not installed on this server.",
+                                className="mt-1 text-xs text-gray-500 dark:text-gray-400"
+                            ) if pa is None else None,
+                            dcc.Checklist(
+                                id='event-export-options',
+                                options=[{'label': ' Include raw heart rate series', 'value': 'raw_hr'}],
+                                value=[],
+                                className="mt-2 text-sm text-gray-700 dark:text-gray-300"
+                            ),
+                            html.Button("Export Events", id="btn-export-events", className="mt-2 px-4 py-2 bg-indigo-500 text-white rounded-lg shadow-md hover:bg-indigo-600 transition-colors duration-200"),
+                            html.A(id="events-download-link", href="", download="pots_events.zip", className="hidden"),
+                            dcc.Download(id="download-events")
+                        ])
                     ]),
                     html.Div(children=[
                         html.H3("Daily Events Chart", className="text-xl font-medium mb-2 text-gray-700 dark:text-gray-300"),
@@ -169,10 +326,52 @@ app.layout = html.Div(className="min-h-screen bg-gray-100 dark:bg-gray-900 text-
                 html.Div(id='zoomed-in-graphs', className="grid grid-cols-1 md:grid-cols-2 gap-6"),
                 html.Button("Export All Graphs as PDF", id="btn-export-pdf", className="mt-6 mr-4 px-4 py-2 bg-green-500 text-white rounded-lg shadow-md hover:bg-green-600 transition-colors duration-200"),
                 dcc.Download(id="download-pdf"),
-                html.Button("Export All Graphs as Zip File", id="btn-export-zip", className="mt-6 px-4 py-2 bg-blue-500 text-white rounded-lg shadow-md hover:bg-blue-600 transition-colors duration-200"),
-                dcc.Download(id="download-zip")
+                html.Button("Export All Graphs as Zip File", id="btn-export-zip", className="mt-6 mr-4 px-4 py-2 bg-blue-500 text-white rounded-lg shadow-md hover:bg-blue-600 transition-colors duration-200"),
+                dcc.Download(id="download-zip"),
+                html.A(id="graphs-zip-download-link", href="", download="pots_graphs.zip", className="hidden"),
+                html.Button("Export Full Report as PDF", id="btn-export-full-pdf", className="mt-6 px-4 py-2 bg-purple-500 text-white rounded-lg shadow-md hover:bg-purple-600 transition-colors duration-200"),
+                dcc.Download(id="download-full-pdf"),
+                html.A(id="full-report-download-link", href="", download="pots_full_report.pdf", className="hidden"),
+                dcc.Checklist(
+                    id='full-report-options',
+                    options=[{'label': ' Draw small event charts as vector graphics (faster, no images)', 'value': 'vector'}],
+                    value=[],
+                    className="mt-4 text-sm text-gray-700 dark:text-gray-300"
+                )
             ])
         ]),
+        html.Div(className="bg-white dark:bg-gray-800 p-6 rounded-lg shadow-lg mb-8", children=[
+            html.H2("Live Monitoring", className="text-2xl font-semibold mb-4 text-indigo-600 dark:text-indigo-300"),
+            html.P(
+                f"Streaming heart rate samples from {LIVE_STREAM_SOURCE}. Potential POTS events appear as soon as their sustained window closes."
+                if LIVE_STREAM_SOURCE else
+                "Live monitoring is disabled. Start the app with POTS_LIVE_SOURCE set to file:<path> or tcp:<host>:<port> to stream 'YYYY-MM-DD HH:MM:SS +HHMM,bpm' samples, one per line.",
+                className="mb-4 text-gray-700 dark:text-gray-300"
+            ),
+            dcc.Graph(
+                id='live-hr-graph',
+                figure=go.Figure(
+                    data=[go.Scatter(x=[], y=[], mode='lines', name='Heart Rate (bpm)', line=dict(color='rgb(79, 70, 229)'))],
+                    layout=dict(
+                        title_text='Live Heart Rate',
+                        xaxis_title='Timestamp',
+                        yaxis_title='Heart Rate (bpm)',
+                        template="plotly_white",
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        font=dict(family="Inter", color="gray"),
+                        title_font_color="indigo",
+                        xaxis=dict(type="date")
+                    )
+                ),
+                config={'displayModeBar': False},
+                className="rounded-lg shadow-md"
+            ),
+            html.H3("Live POTS Events", className="text-xl font-medium mt-6 mb-2 text-gray-700 dark:text-gray-300"),
+            html.Div(id='live-events', className="space-y-2 text-sm text-gray-700 dark:text-gray-300", children=[]),
+            dcc.Interval(id='live-interval', interval=LIVE_VIEW_INTERVAL_MS, disabled=not LIVE_STREAM_SOURCE),
+            dcc.Store(id='live-cursor', data=None)
+        ]),
         html.Div(className="bg-white dark:bg-gray-800 p-6 rounded-lg shadow-lg mb-8", children=[
             html.H2("Understanding POTS", className="text-2xl font-semibold mb-4 text-indigo-600 dark:text-indigo-300"),
             dcc.Markdown(
@@ -226,11 +425,14 @@ app.layout = html.Div(className="min-h-screen bg-gray-100 dark:bg-gray-900 text-
                 1.  **Upload XML File:** Click "Select Files" or drag and drop your `export.xml` file into the designated area.
                 2.  **Adjust Settings:** Use the sliders in the "POTS Event Detection Settings" panel to customize the criteria for identifying potential POTS events. Your current settings will be displayed below the sliders.
                 3.  **Review Summary:** Once the data is processed, a summary table will show the number of potential POTS events per day. You can sort this table and download it as a CSV.
+                    Use "Export Events" to download every detected event, and optionally the raw heart rate series, as Parquet, Feather or CSV files in a Zip archive.
                 4.  **Explore Graphs:**
                     * The "Heart Rate Over Time" graph displays your heart rate data with detected POTS events highlighted.
                     * The "Daily Events Chart" provides a quick visualization of event frequency.
                     * Clicking a row in the "Events Per Day" table will filter the main graph to that specific day and generate detailed "Zoomed-In POTS Events" graphs for each event on that day.
-                5.  **Export Results:** Use the buttons to export the summary table, capture screenshots of individual graphs, or generate a PDF/Zip file containing all graphs.
+                5.  **Live Monitoring:** When the app is started with a live heart rate source, the "Live Monitoring" panel streams new samples and lists potential POTS events as they are detected, using the current settings.
+                6.  **Export Results:** Use the buttons to export the summary table, capture screenshots of individual graphs, or generate a PDF/Zip file containing all graphs.
+                    "Export Full Report as PDF" produces a report covering every day with detected events, not just the selected day.
                 """,
                 className="prose dark:prose-invert max-w-none text-gray-700 dark:text-gray-300"
             )
@@ -317,85 +519,504 @@ def load_settings_from_store(settings_data):
     State('upload-data', 'filename'),
     State('upload-data', 'last_modified')
 )
+@profile_memory
 def upload_and_parse_xml(contents, filename, last_modified):
     if contents is not None:
         try:
-            content_type, content_string = contents.split(',')
-            decoded = base64.b64decode(content_string)
             if filename != 'export.xml':
                 return html.Div('Error: Please upload the export.xml file from the apple_health_export folder.', className="text-red-500"), None, "hidden"
-            heart_rate_data = []
-            context = ET.iterparse(io.BytesIO(decoded), events=('end',))
-            for event, elem in context:
+            profile_stage('parse_xml')
+            start_dates = bytearray()
+            values = array('d')
+            for event, elem in iterparse_upload(contents, events=('end',)):
                 if event == 'end' and elem.tag == 'Record' and elem.get('type') == 'HKQuantityTypeIdentifierHeartRate':
-                    try:
-                        start_date_str = elem.get('startDate')
-                        value_str = elem.get('value')
-                        if start_date_str and value_str:
-                            try:
-                                timestamp = datetime.strptime(start_date_str, '%Y-%m-%d %H:%M:%S %z')
-                            except ValueError:
-                                timestamp = datetime.strptime(start_date_str, '%Y-%m-%d %H:%M:%S')
-                            heart_rate = float(value_str)
-                            heart_rate_data.append({'timestamp': timestamp, 'heart_rate': heart_rate})
-                    except (ValueError, TypeError) as e:
-                        print(f"Skipping record due to parsing error: {e}, Data: {elem.attrib}")
-                    elem.clear()
-            if not heart_rate_data:
+                    start_date_str = elem.get('startDate')
+                    value_str = elem.get('value')
+                    if start_date_str and value_str:
+                        start_dates += start_date_str.encode('ascii', 'replace')[:APPLE_DATE_WIDTH].ljust(APPLE_DATE_WIDTH, b'\0')
+                        try:
+                            values.append(float(value_str))
+                        except ValueError:
+                            values.append(float('nan'))
+                elem.clear()
+            profile_stage('normalize_timestamps')
+            heart_rate_store = build_heart_rate_store(start_dates, values)
+            if heart_rate_store is None:
                 return html.Div('No heart rate data found in the XML file. Please ensure it contains "HKQuantityTypeIdentifierHeartRate" records.', className="text-red-500"), None, "hidden"
-            df = pd.DataFrame(heart_rate_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.sort_values('timestamp').reset_index(drop=True)
-            return html.Div(f'Successfully uploaded {filename}. Processing data...', className="text-green-500"), df.to_json(date_format='iso', orient='split'), ""
+            return html.Div(f'Successfully uploaded {filename}. Processing data...', className="text-green-500"), heart_rate_store, ""
         except Exception as e:
             print(f"Error processing file: {e}")
             return html.Div(f'There was an error processing your file: {e}', className="text-red-500"), None, "hidden"
     return html.Div(''), None, "hidden"
 
-def detect_pots_events(df, hr_increase_threshold, rest_period_duration, variation_threshold, sustained_duration_sec):
+UPLOAD_DECODE_CHUNK_CHARS = 2**20
+
+def iterparse_upload(contents, events):
+    parser = ET.XMLPullParser(events=('start',) + tuple(events))
+    data_start = contents.index(',') + 1
+    root = None
+    for chunk_start in range(data_start, len(contents), UPLOAD_DECODE_CHUNK_CHARS):
+        parser.feed(base64.b64decode(contents[chunk_start:chunk_start + UPLOAD_DECODE_CHUNK_CHARS]))
+        for event, elem in parser.read_events():
+            if root is None:
+                root = elem
+            if event in events:
+                yield event, elem
+        if root is not None:
+            root.clear()
+    parser.close()
+    for event, elem in parser.read_events():
+        if event in events:
+            yield event, elem
+
+APPLE_DATE_WIDTH = len('2024-01-01 00:00:00 +0000')
+NS_PER_DAY = 86400 * 10**9
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+def days_from_civil(year, month, day):
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+def _parse_digits(chars, first, last):
+    digits = chars[:, first:last].astype(np.int64) - ord('0')
+    value = digits @ (10 ** np.arange(last - first - 1, -1, -1, dtype=np.int64))
+    return value, ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+def parse_apple_timestamps(date_strings):
+    if isinstance(date_strings, (bytes, bytearray)):
+        chars = np.frombuffer(date_strings, dtype=np.uint8).reshape(-1, APPLE_DATE_WIDTH)
+        fits = True
+    else:
+        chars = np.array(date_strings, dtype=f'S{APPLE_DATE_WIDTH + 1}').view(np.uint8).reshape(-1, APPLE_DATE_WIDTH + 1)
+        fits = chars[:, APPLE_DATE_WIDTH] == 0
+        chars = chars[:, :APPLE_DATE_WIDTH]
+    year, year_ok = _parse_digits(chars, 0, 4)
+    month, month_ok = _parse_digits(chars, 5, 7)
+    day, day_ok = _parse_digits(chars, 8, 10)
+    hour, hour_ok = _parse_digits(chars, 11, 13)
+    minute, minute_ok = _parse_digits(chars, 14, 16)
+    second, second_ok = _parse_digits(chars, 17, 19)
+    valid = fits & year_ok & month_ok & day_ok & hour_ok & minute_ok & second_ok
+    for col, separator in ((4, '-'), (7, '-'), (10, ' '), (13, ':'), (16, ':')):
+        valid &= chars[:, col] == ord(separator)
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = MONTH_DAYS[np.clip(month, 1, 12) - 1] + ((month == 2) & leap_year)
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days) & (hour <= 23) & (minute <= 59) & (second <= 59)
+    offset_value, offset_ok = _parse_digits(chars, 21, 25)
+    sign = chars[:, 20]
+    has_offset = chars[:, 19] != 0
+    offset_ok &= (chars[:, 19] == ord(' ')) & ((sign == ord('+')) | (sign == ord('-'))) & (offset_value // 100 <= 23) & (offset_value % 100 <= 59)
+    valid &= ~has_offset | offset_ok
+    offset_minutes = (offset_value // 100 * 60 + offset_value % 100) * np.where(sign == ord('-'), -1, 1)
+    offset_minutes = np.where(has_offset & valid, offset_minutes, 0)
+    local_seconds = days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    utc_ns = (local_seconds - offset_minutes * 60) * 10**9
+    return utc_ns, offset_minutes.astype(np.int16), valid
+
+def build_heart_rate_store(start_dates, heart_rates):
+    if not start_dates:
+        return None
+    utc_ns, offset_minutes, valid = parse_apple_timestamps(start_dates)
+    heart_rates = np.asarray(heart_rates, dtype=np.float64)
+    valid &= np.isfinite(heart_rates)
+    if not valid.all():
+        print(f"Skipping {int((~valid).sum())} heart rate records due to parsing errors.")
+    if not valid.any():
+        return None
+    order = np.argsort(utc_ns[valid], kind='stable')
+    utc_ns = utc_ns[valid][order]
+    heart_rates = heart_rates[valid][order].astype(np.float32)
+    offset_table, offset_codes = np.unique(offset_minutes[valid][order], return_inverse=True)
+    dataset_id = hashlib.blake2b(utc_ns.tobytes(), digest_size=16)
+    dataset_id.update(heart_rates.tobytes())
+    return {
+        'dataset_id': dataset_id.hexdigest(),
+        'utc_ns': base64.b64encode(utc_ns.tobytes()).decode('ascii'),
+        'heart_rate': base64.b64encode(heart_rates.tobytes()).decode('ascii'),
+        'offset_codes': base64.b64encode(offset_codes.astype(np.min_scalar_type(len(offset_table))).tobytes()).decode('ascii'),
+        'offset_code_dtype': np.min_scalar_type(len(offset_table)).str,
+        'offset_minutes': offset_table.tolist()
+    }
+
+def load_heart_rate_store(heart_rate_store):
+    utc_ns = np.frombuffer(base64.b64decode(heart_rate_store['utc_ns']), dtype=np.int64)
+    heart_rates = np.frombuffer(base64.b64decode(heart_rate_store['heart_rate']), dtype=np.float32)
+    offset_codes = np.frombuffer(base64.b64decode(heart_rate_store['offset_codes']), dtype=np.dtype(heart_rate_store['offset_code_dtype']))
+    utc_offset_minutes = np.asarray(heart_rate_store['offset_minutes'], dtype=np.int16)[offset_codes]
+    local_ns = utc_ns + utc_offset_minutes.astype(np.int64) * 60 * 10**9
+    df = pd.DataFrame({
+        'timestamp': local_ns.view('datetime64[ns]'),
+        'utc_ns': utc_ns,
+        'utc_offset_minutes': utc_offset_minutes,
+        'heart_rate': heart_rates
+    }, copy=False)
+    df.attrs['utc_offset_range'] = (min(heart_rate_store['offset_minutes']), max(heart_rate_store['offset_minutes']))
+    return df
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+heart_rate_frame_cache = LRUCache(2)
+day_bundle_cache = LRUCache(16)
+_day_bundle_pending = {}
+_day_bundle_lock = threading.Lock()
+day_prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='day-prefetch')
+_day_prefetch_latest = None
+_day_prefetch_scheduled = False
+
+def get_heart_rate_frame(heart_rate_store):
+    dataset_id = heart_rate_store.get('dataset_id')
+    df = heart_rate_frame_cache.get(dataset_id) if dataset_id else None
+    if df is None:
+        df = load_heart_rate_store(heart_rate_store)
+        if dataset_id:
+            heart_rate_frame_cache.put(dataset_id, df)
+    return df
+
+def local_days(df):
+    return df['timestamp'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+
+def window_slice(utc_ns, start_ns, end_ns):
+    return slice(int(np.searchsorted(utc_ns, start_ns, side='left')), int(np.searchsorted(utc_ns, end_ns, side='right')))
+
+EVENT_GRAPH_BEFORE_NS = 5 * 60 * 10**9
+EVENT_GRAPH_AFTER_NS = 10 * 60 * 10**9
+
+def event_utc_times(event):
+    start_ns = pd.Timestamp(event['start_time']).value - event['utc_offset_minutes'] * 60 * 10**9
+    increase_ns = pd.Timestamp(event['increase_time']).value - event['increase_utc_offset_minutes'] * 60 * 10**9
+    return start_ns, increase_ns, increase_ns + int(event['sustained_duration'] * 10**9)
+
+def event_window_slice(df, event):
+    start_ns, increase_ns, _ = event_utc_times(event)
+    return window_slice(df['utc_ns'].to_numpy(), start_ns - EVENT_GRAPH_BEFORE_NS, increase_ns + EVENT_GRAPH_AFTER_NS)
+
+def display_offset_minutes(utc_offset_minutes):
+    offsets, counts = np.unique(utc_offset_minutes, return_counts=True)
+    return int(offsets[counts.argmax()]) if len(offsets) else 0
+
+def display_times(utc_ns, offset_minutes):
+    return (np.asarray(utc_ns, dtype=np.int64) + offset_minutes * 60 * 10**9).view('datetime64[ns]')
+
+def display_time(utc_ns, offset_minutes):
+    return pd.Timestamp(utc_ns + offset_minutes * 60 * 10**9)
+
+def display_axis_title(offset_minutes):
+    sign = '-' if offset_minutes < 0 else '+'
+    hours, minutes = divmod(abs(offset_minutes), 60)
+    return f"Timestamp (UTC{sign}{hours:02d}:{minutes:02d})"
+
+def day_frame(df, date_str):
+    day = np.datetime64(date_str, 'D')
+    day_start_ns = int(day.astype('datetime64[ns]').astype(np.int64))
+    min_offset, max_offset = df.attrs['utc_offset_range']
+    candidates = df.iloc[window_slice(df['utc_ns'].to_numpy(), day_start_ns - max_offset * 60 * 10**9, day_start_ns + NS_PER_DAY - min_offset * 60 * 10**9 - 1)]
+    return candidates[local_days(candidates) == day]
+
+POTS_CHECK_WINDOW_NS = 10 * 60 * 10**9
+POTS_SCAN_CHUNK_ELEMENTS = 2_000_000
+
+def compute_rest_windows(timestamps_ns, heart_rates, hr_increase_threshold, rest_period_ns, variation_threshold):
+    rest_start = np.searchsorted(timestamps_ns, timestamps_ns, side='left')
+    rest_end = np.searchsorted(timestamps_ns, timestamps_ns + rest_period_ns, side='left')
+    check_end = np.searchsorted(timestamps_ns, timestamps_ns + rest_period_ns + POTS_CHECK_WINDOW_NS, side='left')
+    hr64 = np.asarray(heart_rates, dtype=np.float64)
+    prefix_sum = np.concatenate(([0.0], np.cumsum(hr64)))
+    prefix_sq = np.concatenate(([0.0], np.cumsum(hr64 * hr64)))
+    del hr64
+    counts = rest_end - rest_start
+    sums = prefix_sum[rest_end] - prefix_sum[rest_start]
+    sq_sums = prefix_sq[rest_end] - prefix_sq[rest_start]
+    del prefix_sum, prefix_sq
+    with np.errstate(divide='ignore', invalid='ignore'):
+        baselines = sums / counts
+        stds = np.sqrt(np.maximum((counts * sq_sums - sums * sums) / (counts * (counts - 1.0)), 0.0))
+    qualifies = (counts >= 5) & (stds < variation_threshold) & (check_end > rest_end)
+    thresholds = baselines + hr_increase_threshold
+    return qualifies, baselines, thresholds, rest_end, check_end
+
+def _scan_pots_events_loop(timestamps_ns, heart_rates, qualifies, thresholds, check_start, check_end, sustained_ns):
+    n = len(timestamps_ns)
+    starts = np.empty(n, np.int64)
+    increases = np.empty(n, np.int64)
+    count = 0
+    i = 0
+    while i < n:
+        if qualifies[i]:
+            threshold = thresholds[i]
+            k = check_start[i]
+            while k < check_end[i] and heart_rates[k] < threshold:
+                k += 1
+            if k < check_end[i]:
+                sustained_start = k
+                while sustained_start > 0 and timestamps_ns[sustained_start - 1] == timestamps_ns[k]:
+                    sustained_start -= 1
+                sustained_end = k
+                while sustained_end < n and timestamps_ns[sustained_end] < timestamps_ns[k] + sustained_ns:
+                    sustained_end += 1
+                sustained = True
+                for j in range(sustained_start, sustained_end):
+                    if heart_rates[j] < threshold:
+                        sustained = False
+                        break
+                if sustained:
+                    starts[count] = i
+                    increases[count] = k
+                    count += 1
+                    i = sustained_end
+                    continue
+        i += 1
+    return starts[:count], increases[:count]
+
+def _match_windows(heart_rates, window_start, window_end, thresholds, mode):
+    result = np.zeros(len(window_start), dtype=bool) if mode == 'all' else np.full(len(window_start), -1, dtype=np.int64)
+    if len(window_start) == 0:
+        return result
+    lengths = window_end - window_start
+    width = max(int(lengths.max()), 1)
+    rows_per_chunk = max(POTS_SCAN_CHUNK_ELEMENTS // width, 1)
+    offsets = np.arange(width)
+    last = len(heart_rates) - 1
+    for chunk_start in range(0, len(window_start), rows_per_chunk):
+        chunk = slice(chunk_start, chunk_start + rows_per_chunk)
+        valid = offsets[None, :] < lengths[chunk, None]
+        idx = np.minimum(window_start[chunk, None] + offsets[None, :], last)
+        meets = heart_rates[idx] >= thresholds[chunk, None]
+        if mode == 'all':
+            result[chunk] = np.all(meets | ~valid, axis=1)
+        else:
+            meets &= valid
+            result[chunk] = np.where(meets.any(axis=1), window_start[chunk] + meets.argmax(axis=1), -1)
+    return result
+
+def _scan_pots_events_numpy(timestamps_ns, heart_rates, qualifies, thresholds, check_start, check_end, sustained_ns):
+    candidates = np.flatnonzero(qualifies)
+    candidate_thresholds = thresholds[candidates]
+    increases = _match_windows(heart_rates, check_start[candidates], check_end[candidates], candidate_thresholds, 'first')
+    crossed = increases >= 0
+    candidates, increases, candidate_thresholds = candidates[crossed], increases[crossed], candidate_thresholds[crossed]
+    increase_ns = timestamps_ns[increases]
+    sustained_start = np.searchsorted(timestamps_ns, increase_ns, side='left')
+    sustained_end = np.searchsorted(timestamps_ns, increase_ns + sustained_ns, side='left')
+    sustained = _match_windows(heart_rates, sustained_start, sustained_end, candidate_thresholds, 'all')
+    starts = []
+    event_increases = []
+    next_allowed = 0
+    for i, k, end in zip(candidates[sustained].tolist(), increases[sustained].tolist(), sustained_end[sustained].tolist()):
+        if i >= next_allowed:
+            starts.append(i)
+            event_increases.append(k)
+            next_allowed = end
+    return np.array(starts, dtype=np.int64), np.array(event_increases, dtype=np.int64)
+
+POTS_SCAN_BACKENDS = {'numpy': _scan_pots_events_numpy}
+if njit is not None:
+    POTS_SCAN_BACKENDS['numba'] = njit(cache=True)(_scan_pots_events_loop)
+DEFAULT_POTS_SCAN_BACKEND = 'numba' if 'numba' in POTS_SCAN_BACKENDS else 'numpy'
+
+def scan_pots_events(timestamps_ns, heart_rates, hr_increase_threshold, rest_period_duration, variation_threshold, sustained_duration_sec, backend=None):
+    timestamps_ns = np.ascontiguousarray(timestamps_ns, dtype=np.int64)
+    heart_rates = np.ascontiguousarray(heart_rates)
+    if len(timestamps_ns) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    qualifies, baselines, thresholds, check_start, check_end = compute_rest_windows(
+        timestamps_ns, heart_rates, hr_increase_threshold, int(rest_period_duration * 60 * 10**9), variation_threshold
+    )
+    scan = POTS_SCAN_BACKENDS[backend or DEFAULT_POTS_SCAN_BACKEND]
+    starts, increases = scan(timestamps_ns, heart_rates, qualifies, thresholds, check_start, check_end, int(sustained_duration_sec * 10**9))
+    return starts, increases, baselines[starts]
+
+def detect_pots_events(df, hr_increase_threshold, rest_period_duration, variation_threshold, sustained_duration_sec, backend=None):
     if df.empty:
         return []
-    pots_events = []
-    df = df.sort_values('timestamp').reset_index(drop=True)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
     sustained_duration_td = timedelta(seconds=sustained_duration_sec)
-    rest_period_td = timedelta(minutes=rest_period_duration)
-    check_next_td = timedelta(minutes=10)
-    i = 0
-    while i < len(df):
-        rest_start_idx = i
-        rest_end_time = df['timestamp'].iloc[rest_start_idx] + rest_period_td
-        rest_period_readings = df[(df['timestamp'] >= df['timestamp'].iloc[rest_start_idx]) & (df['timestamp'] < rest_end_time)]
-        if len(rest_period_readings) >= 5 and rest_period_readings['heart_rate'].std() < variation_threshold:
-            baseline_hr = rest_period_readings['heart_rate'].mean()
-            rest_start_time = df['timestamp'].iloc[rest_start_idx]
-            rest_end_idx = rest_period_readings.index[-1]
-            check_start_time = rest_end_time
-            check_end_time = check_start_time + check_next_td
-            post_rest_readings = df[(df['timestamp'] >= check_start_time) & (df['timestamp'] < check_end_time)]
-            if not post_rest_readings.empty:
-                potential_increase_readings = post_rest_readings[post_rest_readings['heart_rate'] >= (baseline_hr + hr_increase_threshold)]
-                if not potential_increase_readings.empty:
-                    increase_time = potential_increase_readings['timestamp'].min()
-                    increase_hr = potential_increase_readings[potential_increase_readings['timestamp'] == increase_time]['heart_rate'].iloc[0]
-                    sustained_check_start_time = increase_time
-                    sustained_check_end_time = increase_time + sustained_duration_td
-                    sustained_readings = df[(df['timestamp'] >= sustained_check_start_time) & (df['timestamp'] < sustained_check_end_time)]
-                    if not sustained_readings.empty and (sustained_readings['heart_rate'] >= (baseline_hr + hr_increase_threshold)).all():
-                        pots_events.append({
-                            'start_time': rest_start_time,
-                            'increase_time': increase_time,
-                            'end_time': sustained_check_end_time,
-                            'baseline_hr': baseline_hr,
-                            'peak_hr': increase_hr,
-                            'duration_to_peak': (increase_time - rest_start_time).total_seconds(),
-                            'sustained_duration': sustained_duration_td.total_seconds()
-                        })
-                        i = df[df['timestamp'] >= sustained_check_end_time].index.min() if not df[df['timestamp'] >= sustained_check_end_time].empty else len(df)
-                        continue
-        i += 1
+    utc_ns = df['utc_ns'].to_numpy()
+    starts, increases, baselines = scan_pots_events(
+        utc_ns, df['heart_rate'].to_numpy(),
+        hr_increase_threshold, rest_period_duration, variation_threshold, sustained_duration_sec, backend
+    )
+    pots_events = []
+    for start_idx, increase_idx, baseline_hr in zip(starts.tolist(), increases.tolist(), baselines.tolist()):
+        increase_time = df['timestamp'].iloc[increase_idx]
+        pots_events.append({
+            'start_time': df['timestamp'].iloc[start_idx],
+            'increase_time': increase_time,
+            'end_time': increase_time + sustained_duration_td,
+            'baseline_hr': baseline_hr,
+            'peak_hr': float(df['heart_rate'].iloc[increase_idx]),
+            'duration_to_peak': float(utc_ns[increase_idx] - utc_ns[start_idx]) / 1e9,
+            'sustained_duration': sustained_duration_td.total_seconds(),
+            'utc_offset_minutes': int(df['utc_offset_minutes'].iloc[start_idx]),
+            'increase_utc_offset_minutes': int(df['utc_offset_minutes'].iloc[increase_idx])
+        })
     return pots_events
 
+STREAM_BUFFER_CAPACITY = 100_000
+
+class StreamingPotsDetector:
+    def __init__(self, hr_increase_threshold, rest_period_duration, variation_threshold, sustained_duration_sec, capacity=STREAM_BUFFER_CAPACITY):
+        self.hr_increase_threshold = hr_increase_threshold
+        self.variation_threshold = variation_threshold
+        self.rest_period_ns = int(rest_period_duration * 60 * 10**9)
+        self.sustained_ns = int(sustained_duration_sec * 10**9)
+        self.sustained_duration_td = timedelta(seconds=sustained_duration_sec)
+        self.capacity = capacity
+        self._timestamps_ns = [0] * capacity
+        self._heart_rates = [0.0] * capacity
+        self._offsets_min = [0] * capacity
+        self._prefix_sum = [0.0] * capacity
+        self._prefix_sq = [0.0] * capacity
+        self._running_sum = 0.0
+        self._running_sq = 0.0
+        self.count = 0
+        self.dropped = 0
+        self.out_of_order = 0
+        self._candidate = 0
+        self._rest_start = 0
+        self._rest_end = 0
+        self._check_end = 0
+        self._reset_candidate_scan()
+
+    def _reset_candidate_scan(self):
+        self._scan_pos = None
+        self._crossing = None
+        self._sustained_end = None
+
+    def _prefix(self, values, running, index):
+        return running if index == self.count else values[index % self.capacity]
+
+    def push(self, timestamp_ns, heart_rate, utc_offset_minutes=0):
+        if self.count and timestamp_ns < self._timestamps_ns[(self.count - 1) % self.capacity]:
+            self.out_of_order += 1
+            return []
+        while self.count - self._rest_start >= self.capacity:
+            self._advance_candidate(max(self._candidate + 1, self._rest_start + 1))
+            self.dropped += 1
+        slot = self.count % self.capacity
+        heart_rate = float(heart_rate)
+        self._timestamps_ns[slot] = timestamp_ns
+        self._heart_rates[slot] = heart_rate
+        self._offsets_min[slot] = utc_offset_minutes
+        self._prefix_sum[slot] = self._running_sum
+        self._prefix_sq[slot] = self._running_sq
+        self._running_sum += heart_rate
+        self._running_sq += heart_rate * heart_rate
+        self.count += 1
+        return self._resolve(final=False)
+
+    def flush(self):
+        return self._resolve(final=True)
+
+    def _advance_candidate(self, index):
+        self._candidate = index
+        self._reset_candidate_scan()
+        if index >= self.count:
+            self._rest_start = index
+            return
+        t_i = self._timestamps_ns[index % self.capacity]
+        while self._timestamps_ns[self._rest_start % self.capacity] < t_i:
+            self._rest_start += 1
+
+    def _local_time(self, index):
+        slot = index % self.capacity
+        return pd.Timestamp(self._timestamps_ns[slot] + self._offsets_min[slot] * 60 * 10**9)
+
+    def _resolve(self, final):
+        events = []
+        ts, hr, cap = self._timestamps_ns, self._heart_rates, self.capacity
+        while self._candidate < self.count:
+            i = self._candidate
+            t_i = ts[i % cap]
+            if self._rest_end < i:
+                self._rest_end = i
+            while self._rest_end < self.count and ts[self._rest_end % cap] < t_i + self.rest_period_ns:
+                self._rest_end += 1
+            if self._rest_end == self.count and not final:
+                break
+            rest_end = self._rest_end
+            if self._check_end < rest_end:
+                self._check_end = rest_end
+            while self._check_end < self.count and ts[self._check_end % cap] < t_i + self.rest_period_ns + POTS_CHECK_WINDOW_NS:
+                self._check_end += 1
+            check_end = self._check_end
+            check_closed = final or check_end < self.count
+            counts = rest_end - self._rest_start
+            sums = self._prefix(self._prefix_sum, self._running_sum, rest_end) - self._prefix(self._prefix_sum, self._running_sum, self._rest_start)
+            sq_sums = self._prefix(self._prefix_sq, self._running_sq, rest_end) - self._prefix(self._prefix_sq, self._running_sq, self._rest_start)
+            if counts < 5 or check_end == rest_end and check_closed:
+                self._advance_candidate(i + 1)
+                continue
+            baseline = sums / counts
+            if not math.sqrt(max((counts * sq_sums - sums * sums) / (counts * (counts - 1.0)), 0.0)) < self.variation_threshold:
+                self._advance_candidate(i + 1)
+                continue
+            threshold = baseline + self.hr_increase_threshold
+            if self._crossing is None:
+                if self._scan_pos is None:
+                    self._scan_pos = rest_end
+                while self._scan_pos < check_end and hr[self._scan_pos % cap] < threshold:
+                    self._scan_pos += 1
+                if self._scan_pos == check_end:
+                    if check_closed:
+                        self._advance_candidate(i + 1)
+                        continue
+                    break
+                self._crossing = self._scan_pos
+            k = self._crossing
+            t_k = ts[k % cap]
+            if k > rest_end and ts[(k - 1) % cap] == t_k:
+                self._advance_candidate(i + 1)
+                continue
+            if self._sustained_end is None:
+                self._sustained_end = k
+            while self._sustained_end < self.count and ts[self._sustained_end % cap] < t_k + self.sustained_ns and hr[self._sustained_end % cap] >= threshold:
+                self._sustained_end += 1
+            if self._sustained_end < self.count and ts[self._sustained_end % cap] < t_k + self.sustained_ns:
+                self._advance_candidate(i + 1)
+                continue
+            if self._sustained_end == self.count and not final:
+                break
+            rest_start_time = self._local_time(i)
+            increase_time = self._local_time(k)
+            events.append({
+                'start_time': rest_start_time,
+                'increase_time': increase_time,
+                'end_time': increase_time + self.sustained_duration_td,
+                'baseline_hr': baseline,
+                'peak_hr': hr[k % cap],
+                'duration_to_peak': float(t_k - t_i) / 1e9,
+                'sustained_duration': self.sustained_duration_td.total_seconds(),
+                'utc_offset_minutes': self._offsets_min[i % cap],
+                'increase_utc_offset_minutes': self._offsets_min[k % cap]
+            })
+            self._advance_candidate(self._sustained_end)
+        return events
+
 @app.callback(
     Output('pots-events-data', 'data'),
     Output('summary-table', 'data'),
@@ -407,20 +1028,23 @@ def detect_pots_events(df, hr_increase_threshold, rest_period_duration, variatio
     Input('variation-threshold', 'value'),
     Input('sustained-duration', 'value')
 )
+@profile_memory
 def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration, var_threshold, sustained_duration):
     if jsonified_cleaned_data is None:
         empty_fig = go.Figure()
         empty_fig.update_layout(template="plotly_white", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
         return None, [], empty_fig, empty_fig
+    profile_stage('load_store')
     try:
-        df = pd.read_json(jsonified_cleaned_data, orient='split')
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-    except ValueError as e:
+        df = get_heart_rate_frame(jsonified_cleaned_data)
+    except (ValueError, KeyError, TypeError) as e:
         print(f"Error decoding stored data: {e}")
         empty_fig = go.Figure()
         empty_fig.update_layout(template="plotly_white", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
         return None, [], empty_fig, empty_fig
+    profile_stage('detect_events')
     pots_events = detect_pots_events(df, hr_threshold, rest_duration, var_threshold, sustained_duration)
+    profile_stage('summarize')
     serializable_pots_events = []
     for event in pots_events:
         serializable_pots_events.append({
@@ -428,18 +1052,17 @@ def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration,
             for k, v in event.items()
         })
     if pots_events:
-        events_df = pd.DataFrame(pots_events)
-        events_df['date'] = events_df['start_time'].dt.date
-        daily_events = events_df.groupby('date').size().reset_index(name='Number of Events')
-        daily_events['Date'] = daily_events['date'].astype(str)
-        summary_table_data = daily_events.to_dict('records')
+        event_days = np.array([event['start_time'].to_datetime64() for event in pots_events]).astype('datetime64[D]')
+        days, counts = np.unique(event_days, return_counts=True)
+        summary_table_data = [{'Date': str(day), 'Number of Events': int(count)} for day, count in zip(days, counts)]
     else:
         summary_table_data = []
+    profile_stage('build_figures')
     daily_chart_fig = go.Figure()
-    if daily_events:
+    if summary_table_data:
         daily_chart_fig.add_trace(go.Bar(
-            x=daily_events['Date'],
-            y=daily_events['Number of Events'],
+            x=[row['Date'] for row in summary_table_data],
+            y=[row['Number of Events'] for row in summary_table_data],
             marker_color='indigo'
         ))
         daily_chart_fig.update_layout(
@@ -461,8 +1084,9 @@ def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration,
         )
     main_hr_fig = go.Figure()
     if not df.empty:
+        offset_minutes = display_offset_minutes(df['utc_offset_minutes'].to_numpy())
         main_hr_fig.add_trace(go.Scatter(
-            x=df['timestamp'],
+            x=display_times(df['utc_ns'].to_numpy(), offset_minutes),
             y=df['heart_rate'],
             mode='lines',
             name='Heart Rate (bpm)',
@@ -471,12 +1095,13 @@ def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration,
         shapes = []
         annotations = []
         for event in pots_events:
+            start_ns, increase_ns, end_ns = event_utc_times(event)
             shapes.append(
                 dict(
                     type="rect",
                     xref="x", yref="paper",
-                    x0=event['start_time'], y0=0,
-                    x1=event['end_time'], y1=1,
+                    x0=display_time(start_ns, offset_minutes), y0=0,
+                    x1=display_time(end_ns, offset_minutes), y1=1,
                     fillcolor="rgba(255,0,0,0.2)",
                     line_width=0,
                     layer="below"
@@ -484,7 +1109,7 @@ def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration,
             )
             annotations.append(
                 dict(
-                    x=event['increase_time'], y=event['peak_hr'],
+                    x=display_time(increase_ns, offset_minutes), y=event['peak_hr'],
                     xref="x", yref="y",
                     text=f"POTS Event<br>Peak: {int(event['peak_hr'])} bpm",
                     showarrow=True,
@@ -501,7 +1126,7 @@ def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration,
             shapes=shapes,
             annotations=annotations,
             title_text='Heart Rate Over Time with Potential POTS Events',
-            xaxis_title='Timestamp',
+            xaxis_title=display_axis_title(offset_minutes),
             yaxis_title='Heart Rate (bpm)',
             hovermode='x unified',
             template="plotly_white",
@@ -529,33 +1154,73 @@ def update_analysis_outputs(jsonified_cleaned_data, hr_threshold, rest_duration,
         )
     return serializable_pots_events, summary_table_data, daily_chart_fig, main_hr_fig
 
-@app.callback(
-    Output('main-hr-graph', 'figure', allow_duplicate=True),
-    Output('zoomed-in-graphs', 'children'),
-    Output('current-day-data', 'data'),
-    Input('summary-table', 'selected_rows'),
-    State('summary-table', 'data'),
-    State('stored-data', 'data'),
-    State('pots-events-data', 'data'),
-    prevent_initial_call=True
-)
-def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_data, serializable_pots_events):
-    if not selected_rows or not jsonified_cleaned_data or not serializable_pots_events:
-        return dash.no_update, html.Div("Select a day in the summary table to view detailed event graphs."), None
-    selected_row_index = selected_rows[0]
-    selected_date_str = summary_data[selected_row_index]['Date']
-    selected_date = datetime.strptime(selected_date_str, '%Y-%m-%d').date()
-    df = pd.read_json(jsonified_cleaned_data, orient='split')
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df_day = df[df['timestamp'].dt.date == selected_date]
-    pots_events_day = [
+def deserialize_pots_events(serializable_pots_events):
+    return [
         {k: datetime.fromisoformat(v) if isinstance(v, str) and 'T' in v else v for k, v in event.items()}
-        for event in serializable_pots_events
-        if datetime.fromisoformat(event['start_time']).date() == selected_date
+        for event in (serializable_pots_events or [])
     ]
+
+def build_event_figure(df_event_window, event, title):
+    offset_minutes = event['utc_offset_minutes']
+    start_ns, increase_ns, end_ns = event_utc_times(event)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=display_times(df_event_window['utc_ns'].to_numpy(), offset_minutes),
+        y=df_event_window['heart_rate'],
+        mode='lines',
+        name='Heart Rate (bpm)',
+        line=dict(color='rgb(79, 70, 229)', shape='spline')
+    ))
+    fig.add_shape(
+        type="rect",
+        xref="x", yref="paper",
+        x0=display_time(start_ns, offset_minutes), y0=0,
+        x1=display_time(end_ns, offset_minutes), y1=1,
+        fillcolor="rgba(255,0,0,0.2)",
+        line_width=0,
+        layer="below"
+    )
+    fig.add_annotation(
+        x=display_time(increase_ns, offset_minutes), y=event['peak_hr'],
+        xref="x", yref="y",
+        text=f"POTS Event<br>Peak: {int(event['peak_hr'])} bpm",
+        showarrow=True,
+        arrowhead=2,
+        ax=0, ay=-40,
+        bgcolor="rgba(255,255,255,0.7)",
+        bordercolor="rgba(255,0,0,0.7)",
+        borderwidth=1,
+        borderpad=4,
+        font=dict(size=10, color="red")
+    )
+    fig.update_layout(
+        title_text=title,
+        xaxis_title=display_axis_title(offset_minutes),
+        yaxis_title='Heart Rate (bpm)',
+        hovermode='x unified',
+        template="plotly_white",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter", color="gray"),
+        title_font_color="indigo",
+        xaxis=dict(
+            range=[display_time(start_ns - EVENT_GRAPH_BEFORE_NS, offset_minutes), display_time(increase_ns + EVENT_GRAPH_AFTER_NS, offset_minutes)],
+            rangeslider=dict(visible=True),
+            type="date"
+        )
+    )
+    return fig
+
+def build_day_bundle(df, selected_date_str, serializable_pots_events_day):
+    profile_stage('select_day')
+    df_day = day_frame(df, selected_date_str)
+    pots_events_day = deserialize_pots_events(serializable_pots_events_day)
+    profile_stage('build_figures')
+    offset_minutes = display_offset_minutes(df_day['utc_offset_minutes'].to_numpy())
+    day_times = display_times(df_day['utc_ns'].to_numpy(), offset_minutes)
     main_hr_fig = go.Figure()
     main_hr_fig.add_trace(go.Scatter(
-        x=df_day['timestamp'],
+        x=day_times,
         y=df_day['heart_rate'],
         mode='lines',
         name='Heart Rate (bpm)',
@@ -564,12 +1229,13 @@ def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_d
     shapes = []
     annotations = []
     for event in pots_events_day:
+        start_ns, increase_ns, end_ns = event_utc_times(event)
         shapes.append(
             dict(
                 type="rect",
                 xref="x", yref="paper",
-                x0=event['start_time'], y0=0,
-                x1=event['end_time'], y1=1,
+                x0=display_time(start_ns, offset_minutes), y0=0,
+                x1=display_time(end_ns, offset_minutes), y1=1,
                 fillcolor="rgba(255,0,0,0.2)",
                 line_width=0,
                 layer="below"
@@ -577,7 +1243,7 @@ def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_d
         )
         annotations.append(
             dict(
-                x=event['increase_time'], y=event['peak_hr'],
+                x=display_time(increase_ns, offset_minutes), y=event['peak_hr'],
                 xref="x", yref="y",
                 text=f"POTS Event<br>Peak: {int(event['peak_hr'])} bpm",
                 showarrow=True,
@@ -594,7 +1260,7 @@ def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_d
         shapes=shapes,
         annotations=annotations,
         title_text=f'Heart Rate for {selected_date_str} with Potential POTS Events',
-        xaxis_title='Timestamp',
+        xaxis_title=display_axis_title(offset_minutes),
         yaxis_title='Heart Rate (bpm)',
         hovermode='x unified',
         template="plotly_white",
@@ -603,7 +1269,7 @@ def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_d
         font=dict(family="Inter", color="gray"),
         title_font_color="indigo",
         xaxis=dict(
-            range=[df_day['timestamp'].min(), df_day['timestamp'].max()],
+            range=[day_times.min(), day_times.max()] if len(day_times) else None,
             rangeselector=dict(
                 buttons=list([
                     dict(count=1, label="1h", step="hour", stepmode="backward"),
@@ -618,65 +1284,108 @@ def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_d
     )
     zoomed_in_graphs = []
     for i, event in enumerate(pots_events_day):
-        graph_start_time = event['start_time'] - timedelta(minutes=5)
-        graph_end_time = event['increase_time'] + timedelta(minutes=10)
-        df_event_window = df[(df['timestamp'] >= graph_start_time) & (df['timestamp'] <= graph_end_time)]
+        df_event_window = df.iloc[event_window_slice(df, event)]
         if not df_event_window.empty:
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df_event_window['timestamp'],
-                y=df_event_window['heart_rate'],
-                mode='lines',
-                name='Heart Rate (bpm)',
-                line=dict(color='rgb(79, 70, 229)', shape='spline')
-            ))
-            fig.add_shape(
-                type="rect",
-                xref="x", yref="paper",
-                x0=event['start_time'], y0=0,
-                x1=event['end_time'], y1=1,
-                fillcolor="rgba(255,0,0,0.2)",
-                line_width=0,
-                layer="below"
-            )
-            fig.add_annotation(
-                x=event['increase_time'], y=event['peak_hr'],
-                xref="x", yref="y",
-                text=f"POTS Event<br>Peak: {int(event['peak_hr'])} bpm",
-                showarrow=True,
-                arrowhead=2,
-                ax=0, ay=-40,
-                bgcolor="rgba(255,255,255,0.7)",
-                bordercolor="rgba(255,0,0,0.7)",
-                borderwidth=1,
-                borderpad=4,
-                font=dict(size=10, color="red")
-            )
-            fig.update_layout(
-                title_text=f'POTS Event {i+1} on {selected_date_str} (Baseline: {int(event["baseline_hr"])} bpm)',
-                xaxis_title='Timestamp',
-                yaxis_title='Heart Rate (bpm)',
-                hovermode='x unified',
-                template="plotly_white",
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(family="Inter", color="gray"),
-                title_font_color="indigo",
-                xaxis=dict(
-                    range=[graph_start_time, graph_end_time],
-                    rangeslider=dict(visible=True),
-                    type="date"
-                )
-            )
+            fig = build_event_figure(df_event_window, event, f'POTS Event {i+1} on {selected_date_str} (Baseline: {int(event["baseline_hr"])} bpm)')
             zoomed_in_graphs.append(
                 html.Div(dcc.Graph(figure=fig, config={'displayModeBar': True}), className="rounded-lg shadow-md")
             )
-    current_day_data_json = df_day.to_json(date_format='iso', orient='split')
-    current_day_pots_events_json = [
-        {k: v.isoformat() if isinstance(v, datetime) else v for k, v in event.items()}
-        for event in pots_events_day
-    ]
-    return main_hr_fig, zoomed_in_graphs, {'df_day': current_day_data_json, 'pots_events_day': current_day_pots_events_json}
+    profile_stage('serialize_day')
+    current_day_data_json = df_day[['timestamp', 'heart_rate']].to_json(date_format='iso', orient='split')
+    return main_hr_fig, zoomed_in_graphs, {'df_day': current_day_data_json, 'pots_events_day': serializable_pots_events_day}
+
+def day_bundle_key(dataset_id, selected_date_str, serializable_pots_events):
+    serializable_pots_events_day = [event for event in serializable_pots_events if event['start_time'][:10] == selected_date_str]
+    return (dataset_id, selected_date_str, json.dumps(serializable_pots_events_day, sort_keys=True)), serializable_pots_events_day
+
+def get_day_bundle(df, dataset_id, selected_date_str, serializable_pots_events):
+    key, serializable_pots_events_day = day_bundle_key(dataset_id, selected_date_str, serializable_pots_events)
+    if dataset_id is None:
+        return build_day_bundle(df, selected_date_str, serializable_pots_events_day)
+    with _day_bundle_lock:
+        bundle = day_bundle_cache.get(key)
+        if bundle is not None:
+            return bundle
+        pending = _day_bundle_pending.get(key)
+        if pending is None:
+            pending = _day_bundle_pending[key] = Future()
+            owner = True
+        else:
+            owner = False
+    if not owner:
+        return pending.result()
+    try:
+        bundle = build_day_bundle(df, selected_date_str, serializable_pots_events_day)
+        day_bundle_cache.put(key, bundle)
+        pending.set_result(bundle)
+        return bundle
+    except Exception as e:
+        pending.set_exception(e)
+        raise
+    finally:
+        with _day_bundle_lock:
+            _day_bundle_pending.pop(key, None)
+
+def _drain_day_prefetch():
+    global _day_prefetch_latest, _day_prefetch_scheduled
+    while True:
+        with _day_bundle_lock:
+            request, _day_prefetch_latest = _day_prefetch_latest, None
+            if request is None:
+                _day_prefetch_scheduled = False
+                return
+        df, dataset_id, neighbours, serializable_pots_events = request
+        del request
+        for neighbour in neighbours:
+            if _day_prefetch_latest is not None:
+                break
+            try:
+                get_day_bundle(df, dataset_id, neighbour, serializable_pots_events)
+            except Exception as e:
+                print(f"Error prefetching {neighbour}: {e}")
+        del df, serializable_pots_events
+
+def prefetch_neighbouring_days(df, dataset_id, selected_date_str, summary_data, serializable_pots_events):
+    global _day_prefetch_latest, _day_prefetch_scheduled
+    if dataset_id is None:
+        return
+    dates = sorted(row['Date'] for row in summary_data)
+    position = dates.index(selected_date_str)
+    neighbours = []
+    for neighbour in dates[max(position - 1, 0):position] + dates[position + 1:position + 2]:
+        key, _ = day_bundle_key(dataset_id, neighbour, serializable_pots_events)
+        with _day_bundle_lock:
+            if key not in day_bundle_cache and key not in _day_bundle_pending:
+                neighbours.append(neighbour)
+    with _day_bundle_lock:
+        _day_prefetch_latest = (df, dataset_id, neighbours, serializable_pots_events) if neighbours else None
+        if _day_prefetch_latest is None or _day_prefetch_scheduled:
+            return
+        _day_prefetch_scheduled = True
+    day_prefetch_executor.submit(_drain_day_prefetch)
+
+@app.callback(
+    Output('main-hr-graph', 'figure', allow_duplicate=True),
+    Output('zoomed-in-graphs', 'children'),
+    Output('current-day-data', 'data'),
+    Input('summary-table', 'selected_rows'),
+    State('summary-table', 'data'),
+    State('stored-data', 'data'),
+    State('pots-events-data', 'data'),
+    prevent_initial_call=True
+)
+@profile_memory
+def update_graphs_on_row_select(selected_rows, summary_data, jsonified_cleaned_data, serializable_pots_events):
+    if not selected_rows or not jsonified_cleaned_data or not serializable_pots_events:
+        return dash.no_update, html.Div("Select a day in the summary table to view detailed event graphs."), None
+    selected_date_str = summary_data[selected_rows[0]]['Date']
+    profile_stage('load_store')
+    df = get_heart_rate_frame(jsonified_cleaned_data)
+    dataset_id = jsonified_cleaned_data.get('dataset_id')
+    bundle = get_day_bundle(df, dataset_id, selected_date_str, serializable_pots_events)
+    profile_stage('prefetch')
+    prefetch_neighbouring_days(df, dataset_id, selected_date_str, summary_data, serializable_pots_events)
+    return bundle
 
 @app.callback(
     Output("download-csv", "data"),
@@ -707,6 +1416,21 @@ app.clientside_callback(
     prevent_initial_call=True
 )
 
+def build_summary_table(summary_table_data):
+    df_summary = pd.DataFrame(summary_table_data)
+    table_data = [df_summary.columns.tolist()] + df_summary.values.tolist()
+    table = Table(table_data)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    return table
+
 @app.callback(
     Output("download-pdf", "data"),
     Input("btn-export-pdf", "n_clicks"),
@@ -727,19 +1451,7 @@ def export_all_graphs_as_pdf(n_clicks, main_fig_json, daily_chart_fig_json, zoom
         story.append(Spacer(1, 0.2 * inch))
         story.append(Paragraph("POTS Event Summary", styles['h2']))
         if summary_table_data:
-            df_summary = pd.DataFrame(summary_table_data)
-            table_data = [df_summary.columns.tolist()] + df_summary.values.tolist()
-            table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
+            story.append(build_summary_table(summary_table_data))
         else:
             story.append(Paragraph("No summary data available.", styles['Normal']))
         story.append(Spacer(1, 0.5 * inch))
@@ -780,7 +1492,159 @@ def export_all_graphs_as_pdf(n_clicks, main_fig_json, daily_chart_fig_json, zoom
         return dcc.send_bytes(buffer.getvalue(), "pots_report.pdf")
     return None
 
+REPORT_VECTOR_MAX_POINTS = 2000
+
+class LazyFigureImage(Flowable):
+    def __init__(self, build_figure, width, height, px_width=800, px_height=400):
+        Flowable.__init__(self)
+        self.build_figure = build_figure
+        self.width = width
+        self.height = height
+        self.px_width = px_width
+        self.px_height = px_height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        img_bytes = pio.to_image(self.build_figure(), format='png', width=self.px_width, height=self.px_height)
+        self.canv.drawImage(ImageReader(io.BytesIO(img_bytes)), 0, 0, width=self.width, height=self.height)
+        self.build_figure = None
+
+def build_report_event_figure(df, lo, hi, serializable_event, title):
+    return build_event_figure(df.iloc[lo:hi], deserialize_pots_events([serializable_event])[0], title)
+
+class VectorEventChart(Flowable):
+    def __init__(self, df, lo, hi, serializable_event, width, height):
+        Flowable.__init__(self)
+        self.df = df
+        self.lo = lo
+        self.hi = hi
+        self.serializable_event = serializable_event
+        self.width = width
+        self.height = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        c = self.canv
+        event = deserialize_pots_events([self.serializable_event])[0]
+        timestamps_ns = self.df['utc_ns'].to_numpy()[self.lo:self.hi]
+        heart_rates = self.df['heart_rate'].to_numpy()[self.lo:self.hi]
+        left, bottom = 0.5 * inch, 0.35 * inch
+        plot_width = self.width - left - 0.2 * inch
+        plot_height = self.height - bottom - 0.2 * inch
+        start_ns, increase_ns, end_ns = event_utc_times(event)
+        t0 = start_ns - EVENT_GRAPH_BEFORE_NS
+        span = max(increase_ns + EVENT_GRAPH_AFTER_NS - t0, 1)
+        hr_min = min(float(heart_rates.min()), event['baseline_hr']) - 5
+        hr_max = max(float(heart_rates.max()), event['peak_hr']) + 5
+
+        def x_of(t):
+            return left + min(max((t - t0) / span, 0.0), 1.0) * plot_width
+
+        def y_of(hr):
+            return bottom + (hr - hr_min) / (hr_max - hr_min) * plot_height
+
+        c.saveState()
+        c.setFillColor(colors.Color(1, 0, 0, alpha=0.2))
+        event_x0 = x_of(start_ns)
+        event_x1 = x_of(end_ns)
+        c.rect(event_x0, bottom, event_x1 - event_x0, plot_height, stroke=0, fill=1)
+        c.setStrokeColor(colors.lightgrey)
+        c.rect(left, bottom, plot_width, plot_height, stroke=1, fill=0)
+        c.setStrokeColorRGB(79 / 255, 70 / 255, 229 / 255)
+        c.setLineWidth(1)
+        path = c.beginPath()
+        path.moveTo(x_of(int(timestamps_ns[0])), y_of(float(heart_rates[0])))
+        for t, hr in zip(timestamps_ns[1:].tolist(), heart_rates[1:].tolist()):
+            path.lineTo(x_of(t), y_of(hr))
+        c.drawPath(path, stroke=1, fill=0)
+        peak_x = x_of(increase_ns)
+        peak_y = y_of(event['peak_hr'])
+        c.setFillColor(colors.red)
+        c.circle(peak_x, peak_y, 2, stroke=0, fill=1)
+        c.setFont('Helvetica', 8)
+        c.drawString(peak_x + 4, peak_y + 4, f"POTS Event - Peak: {int(event['peak_hr'])} bpm")
+        c.setFillColor(colors.grey)
+        c.setFont('Helvetica', 7)
+        for frac in (0.0, 0.25, 0.5, 0.75, 1.0):
+            label_time = display_time(t0 + int(frac * span), event['utc_offset_minutes'])
+            c.drawCentredString(left + frac * plot_width, bottom - 10, label_time.strftime('%H:%M'))
+        for hr in (hr_min, (hr_min + hr_max) / 2, hr_max):
+            c.drawRightString(left - 4, y_of(hr) - 2, str(int(round(hr))))
+        c.restoreState()
+        self.df = None
+        self.serializable_event = None
+
+@app.callback(
+    Output("full-report-download-link", "href"),
+    Output("download-full-pdf", "data"),
+    Input("btn-export-full-pdf", "n_clicks"),
+    State('stored-data', 'data'),
+    State('pots-events-data', 'data'),
+    State('summary-table', 'data'),
+    State('daily-events-chart', 'figure'),
+    State('full-report-options', 'value'),
+    prevent_initial_call=True,
+)
+@profile_memory
+def export_full_report_as_pdf(n_clicks, jsonified_cleaned_data, serializable_pots_events, summary_table_data, daily_chart_fig_json, report_options):
+    if not n_clicks or not jsonified_cleaned_data:
+        return dash.no_update, dash.no_update
+    use_vector = 'vector' in (report_options or [])
+    profile_stage('load_store')
+    df = get_heart_rate_frame(jsonified_cleaned_data)
+    serializable_pots_events = serializable_pots_events or []
+    events_by_day = {}
+    for event_index, serializable_event in enumerate(serializable_pots_events):
+        events_by_day.setdefault(serializable_event['start_time'][:10], []).append(event_index)
+    styles = getSampleStyleSheet()
+    story = []
+    story.append(Paragraph("POTS Screener Full Report", styles['h1']))
+    story.append(Spacer(1, 0.2 * inch))
+    story.append(Paragraph("POTS Event Summary", styles['h2']))
+    if summary_table_data:
+        story.append(build_summary_table(summary_table_data))
+    else:
+        story.append(Paragraph("No summary data available.", styles['Normal']))
+    story.append(Spacer(1, 0.5 * inch))
+    if daily_chart_fig_json:
+        story.append(Paragraph("Daily Potential POTS Events Chart", styles['h2']))
+        story.append(LazyFigureImage(partial(go.Figure, daily_chart_fig_json), 7.5 * inch, 3.75 * inch))
+    for day in sorted(events_by_day):
+        story.append(PageBreak())
+        story.append(Paragraph(f"Potential POTS Events on {day}", styles['h2']))
+        for i, event_index in enumerate(events_by_day[day]):
+            serializable_event = serializable_pots_events[event_index]
+            event = deserialize_pots_events([serializable_event])[0]
+            window = event_window_slice(df, event)
+            lo, hi = window.start, window.stop
+            if lo == hi:
+                continue
+            story.append(Paragraph(f"Event {i+1} (Baseline: {int(event['baseline_hr'])} bpm, Peak: {int(event['peak_hr'])} bpm)", styles['h3']))
+            if use_vector and hi - lo <= REPORT_VECTOR_MAX_POINTS:
+                story.append(VectorEventChart(df, lo, hi, serializable_event, 7.5 * inch, 3.75 * inch))
+            else:
+                title = f'POTS Event {i+1} on {day} (Baseline: {int(event["baseline_hr"])} bpm)'
+                story.append(LazyFigureImage(partial(build_report_event_figure, df, lo, hi, serializable_event, title), 7.5 * inch, 3.75 * inch))
+            story.append(Spacer(1, 0.2 * inch))
+    if not events_by_day:
+        story.append(Paragraph("No POTS events detected for the uploaded data.", styles['Normal']))
+    profile_stage('render_report')
+    report_path = new_export_path('.pdf')
+    try:
+        doc = SimpleDocTemplate(report_path, pagesize=landscape(letter))
+        doc.build(story)
+    except Exception:
+        _remove_file(report_path)
+        raise
+    profile_stage('deliver_report')
+    return deliver_export(report_path, "pots_full_report.pdf")
+
 @app.callback(
+    Output("graphs-zip-download-link", "href"),
     Output("download-zip", "data"),
     Input("btn-export-zip", "n_clicks"),
     State('main-hr-graph', 'figure'),
@@ -789,27 +1653,332 @@ def export_all_graphs_as_pdf(n_clicks, main_fig_json, daily_chart_fig_json, zoom
     prevent_initial_call=True,
 )
 def export_all_graphs_as_zip(n_clicks, main_fig_json, daily_chart_fig_json, zoomed_in_graphs_children):
-    if n_clicks:
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+    if not n_clicks:
+        return dash.no_update, dash.no_update
+    zip_path = new_export_path('.zip')
+    try:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
             if main_fig_json:
                 main_fig = go.Figure(main_fig_json)
-                main_img_bytes = pio.to_image(main_fig, format='png', width=1200, height=600)
-                zf.writestr("main_hr_graph.png", main_img_bytes)
+                zf.writestr("main_hr_graph.png", pio.to_image(main_fig, format='png', width=1200, height=600))
             if daily_chart_fig_json:
                 daily_chart_fig = go.Figure(daily_chart_fig_json)
-                daily_chart_img_bytes = pio.to_image(daily_chart_fig, format='png', width=800, height=400)
-                zf.writestr("daily_events_chart.png", daily_chart_img_bytes)
+                zf.writestr("daily_events_chart.png", pio.to_image(daily_chart_fig, format='png', width=800, height=400))
             if zoomed_in_graphs_children:
                 for i, child in enumerate(zoomed_in_graphs_children):
                     if 'props' in child and 'figure' in child['props']:
-                        fig_json = child['props']['figure']
-                        fig = go.Figure(fig_json)
-                        img_bytes = pio.to_image(fig, format='png', width=800, height=400)
-                        zf.writestr(f"pots_event_{i+1}.png", img_bytes)
-        zip_buffer.seek(0)
-        return dcc.send_bytes(zip_buffer.getvalue(), "pots_graphs.zip")
-    return None
+                        fig = go.Figure(child['props']['figure'])
+                        zf.writestr(f"pots_event_{i+1}.png", pio.to_image(fig, format='png', width=800, height=400))
+    except Exception:
+        _remove_file(zip_path)
+        raise
+    return deliver_export(zip_path, "pots_graphs.zip")
+
+EVENT_EXPORT_COLUMNS = ['start_time', 'increase_time', 'end_time', 'baseline_hr', 'peak_hr', 'duration_to_peak', 'utc_offset_minutes', 'increase_utc_offset_minutes']
+EXPORT_CHUNK_ROWS = 100000
+EXPORT_DIR = os.environ.get('POTS_EXPORT_DIR')
+EXPORT_SECRET = os.environ.get('POTS_EXPORT_SECRET', '').encode() or secrets.token_bytes(32)
+EXPORT_FILE_PREFIX = 'pots-export-'
+EXPORT_MAX_AGE_SECONDS = 15 * 60
+EXPORT_STREAM_CHUNK_BYTES = 2**20
+if EXPORT_DIR:
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+
+def heart_rate_export_chunks(df):
+    for start in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        yield pd.DataFrame({
+            'timestamp_utc': pd.to_datetime(chunk['utc_ns'].to_numpy(), unit='ns', utc=True),
+            'utc_offset_minutes': chunk['utc_offset_minutes'].to_numpy(),
+            'heart_rate': chunk['heart_rate'].to_numpy()
+        })
+
+def write_export_entry(zf, name, chunks, export_format):
+    if export_format in ('parquet', 'feather') and pa is not None:
+        with zf.open(f"{name}.{export_format}", 'w', force_zip64=True) as entry:
+            writer = None
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(entry, table.schema) if export_format == 'parquet' else ipc.new_file(entry, table.schema)
+                writer.write_table(table)
+            writer.close()
+        return
+    with zf.open(f"{name}.csv", 'w', force_zip64=True) as entry:
+        text = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(text, header=i == 0, index=False)
+        text.flush()
+        text.detach()
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def sweep_export_dir():
+    cutoff = time.time() - EXPORT_MAX_AGE_SECONDS
+    with os.scandir(EXPORT_DIR) as entries:
+        for entry in entries:
+            try:
+                if entry.name.startswith(EXPORT_FILE_PREFIX) and entry.stat().st_mtime < cutoff:
+                    _remove_file(entry.path)
+            except FileNotFoundError:
+                pass
+
+def new_export_path(suffix):
+    if EXPORT_DIR:
+        sweep_export_dir()
+        return os.path.join(EXPORT_DIR, f"{EXPORT_FILE_PREFIX}{secrets.token_hex(16)}{suffix}")
+    export_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    export_file.close()
+    return export_file.name
+
+def export_signature(name, filename):
+    return hmac.new(EXPORT_SECRET, f"{name}/{filename}".encode(), hashlib.sha256).hexdigest()
+
+def deliver_export(path, filename):
+    if EXPORT_DIR:
+        name = os.path.basename(path)
+        return f"/exports/{name}/{export_signature(name, filename)}/{filename}", dash.no_update
+    try:
+        return dash.no_update, dcc.send_file(path, filename=filename)
+    finally:
+        _remove_file(path)
+
+def stream_export_file(path):
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(EXPORT_STREAM_CHUNK_BYTES):
+                yield chunk
+    finally:
+        _remove_file(path)
+
+@app.server.route('/exports/<name>/<signature>/<filename>')
+def serve_export_download(name, signature, filename):
+    if not EXPORT_DIR or not name.startswith(EXPORT_FILE_PREFIX) or not hmac.compare_digest(signature, export_signature(name, filename)):
+        flask.abort(404)
+    path = os.path.join(EXPORT_DIR, name)
+    claimed_path = f"{path}.{secrets.token_hex(4)}.sending"
+    try:
+        os.rename(path, claimed_path)
+    except FileNotFoundError:
+        flask.abort(404)
+    return flask.Response(stream_export_file(claimed_path), mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Content-Length': str(os.path.getsize(claimed_path))
+    })
+
+@app.callback(
+    Output("events-download-link", "href"),
+    Output("download-events", "data"),
+    Input("btn-export-events", "n_clicks"),
+    State('stored-data', 'data'),
+    State('pots-events-data', 'data'),
+    State('event-export-format', 'value'),
+    State('event-export-options', 'value'),
+    prevent_initial_call=True,
+)
+@profile_memory
+def export_events(n_clicks, jsonified_cleaned_data, serializable_pots_events, export_format, export_options):
+    if not n_clicks or not jsonified_cleaned_data:
+        return dash.no_update, dash.no_update
+    profile_stage('write_events')
+    events_frame = pd.DataFrame(deserialize_pots_events(serializable_pots_events), columns=EVENT_EXPORT_COLUMNS)
+    export_path = new_export_path('.zip')
+    try:
+        with zipfile.ZipFile(export_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            write_export_entry(zf, "pots_events", [events_frame], export_format)
+            if 'raw_hr' in (export_options or []):
+                profile_stage('write_heart_rate')
+                write_export_entry(zf, "heart_rate", heart_rate_export_chunks(get_heart_rate_frame(jsonified_cleaned_data)), export_format)
+    except Exception:
+        _remove_file(export_path)
+        raise
+    return deliver_export(export_path, "pots_events.zip")
+
+for download_link_id in ("events-download-link", "graphs-zip-download-link", "full-report-download-link"):
+    app.clientside_callback(
+        """
+        function followDownloadLink(href, link_id) {
+            if (href) {
+                document.getElementById(link_id).click();
+            }
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output(download_link_id, 'title'),
+        Input(download_link_id, 'href'),
+        State(download_link_id, 'id'),
+        prevent_initial_call=True
+    )
+
+def parse_stream_line(line):
+    date_str, _, value_str = line.strip().rpartition(',')
+    try:
+        heart_rate = float(value_str)
+    except ValueError:
+        return None
+    utc_ns, offset_minutes, valid = parse_apple_timestamps([date_str])
+    if not valid[0] or not math.isfinite(heart_rate):
+        return None
+    return int(utc_ns[0]), int(offset_minutes[0]), heart_rate
+
+def follow_file(path, poll_interval=0.5):
+    with open(path, encoding='ascii', errors='replace') as f:
+        pending = ''
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            if pending.endswith('\n'):
+                yield pending
+                pending = ''
+
+def socket_lines(host, port):
+    with socket.create_server((host, port)) as server:
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile('r', encoding='ascii', errors='replace') as stream:
+                yield from stream
+
+def open_stream_source(source):
+    kind, _, target = source.partition(':')
+    if kind == 'file':
+        return follow_file(target)
+    if kind == 'tcp':
+        host, _, port = target.rpartition(':')
+        return socket_lines(host or '127.0.0.1', int(port))
+    raise ValueError(f"Unsupported live source: {source}")
+
+class LiveSession:
+    def __init__(self, source):
+        self.lock = threading.Lock()
+        self.session_id = secrets.token_hex(8)
+        self.history = deque(maxlen=LIVE_HISTORY_SAMPLES)
+        self.sample_seq = 0
+        self.display_offset_minutes = None
+        self.detectors = OrderedDict()
+        self._detector_ids = 0
+        self.thread = threading.Thread(target=self._run, args=(source,), name='live-stream', daemon=True)
+        self.thread.start()
+
+    def _detector(self, settings):
+        state = self.detectors.get(settings)
+        if state is None:
+            self._detector_ids += 1
+            state = self.detectors[settings] = {
+                'id': self._detector_ids,
+                'detector': StreamingPotsDetector(*settings),
+                'events': deque(maxlen=LIVE_EVENTS_MAX),
+                'event_seq': 0
+            }
+            for _, utc_ns, offset_minutes, heart_rate in self.history:
+                self._push(state, utc_ns, heart_rate, offset_minutes)
+            while len(self.detectors) > LIVE_DETECTORS_MAX:
+                self.detectors.popitem(last=False)
+        self.detectors.move_to_end(settings)
+        return state
+
+    def _push(self, state, utc_ns, heart_rate, offset_minutes):
+        for event in state['detector'].push(utc_ns, heart_rate, offset_minutes):
+            state['event_seq'] += 1
+            state['events'].append((state['event_seq'], event))
+
+    def _run(self, source):
+        try:
+            for line in open_stream_source(source):
+                sample = parse_stream_line(line)
+                if sample is None:
+                    continue
+                utc_ns, offset_minutes, heart_rate = sample
+                with self.lock:
+                    if self.display_offset_minutes is None:
+                        self.display_offset_minutes = offset_minutes
+                    self.sample_seq += 1
+                    self.history.append((self.sample_seq, utc_ns, offset_minutes, heart_rate))
+                    for state in self.detectors.values():
+                        self._push(state, utc_ns, heart_rate, offset_minutes)
+        except Exception as e:
+            print(f"Live stream from {source} stopped: {e}")
+
+    def read_since(self, cursor, settings):
+        with self.lock:
+            state = self._detector(settings)
+            restarted = cursor.get('session') != self.session_id or cursor['sample'] > self.sample_seq
+            new_samples = max(0, min(self.sample_seq - (0 if restarted else cursor['sample']), len(self.history), LIVE_VIEW_MAX_POINTS))
+            samples = [
+                (display_time(utc_ns, self.display_offset_minutes), heart_rate)
+                for _, utc_ns, _, heart_rate in list(islice(reversed(self.history), new_samples))[::-1]
+            ]
+            reset_events = restarted or cursor['detector'] != state['id']
+            events = [event for seq, event in state['events'] if reset_events or seq > cursor['event']]
+            new_cursor = {'session': self.session_id, 'sample': self.sample_seq, 'event': state['event_seq'], 'detector': state['id']}
+        return samples, events, restarted, reset_events, new_cursor
+
+live_session = None
+_live_session_lock = threading.Lock()
+
+def get_live_session():
+    global live_session
+    if not LIVE_STREAM_SOURCE:
+        return None
+    with _live_session_lock:
+        if live_session is None:
+            live_session = LiveSession(LIVE_STREAM_SOURCE)
+    return live_session
+
+def live_event_item(event):
+    return html.Div(
+        f"{event['start_time']:%Y-%m-%d %H:%M:%S}: rest baseline {int(event['baseline_hr'])} bpm, "
+        f"rose to {int(event['peak_hr'])} bpm after {int(event['duration_to_peak'])} s",
+        className="p-2 rounded-lg bg-red-50 dark:bg-red-900 border border-red-200 dark:border-red-700"
+    )
+
+@app.callback(
+    Output('live-hr-graph', 'figure'),
+    Output('live-hr-graph', 'extendData'),
+    Output('live-events', 'children'),
+    Output('live-cursor', 'data'),
+    Input('live-interval', 'n_intervals'),
+    State('live-cursor', 'data'),
+    State('settings-store', 'data'),
+    prevent_initial_call=True
+)
+def update_live_view(n_intervals, cursor, settings_data):
+    session = get_live_session()
+    if session is None:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    settings_data = settings_data or {}
+    settings = (
+        settings_data.get('hr_increase_threshold', 30),
+        settings_data.get('rest_period_duration', 5),
+        settings_data.get('variation_threshold', 5),
+        settings_data.get('sustained_duration', 60)
+    )
+    samples, events, restarted, reset_events, new_cursor = session.read_since(cursor or {}, settings)
+    times = [timestamp.isoformat() for timestamp, _ in samples]
+    heart_rates = [heart_rate for _, heart_rate in samples]
+    figure = dash.no_update
+    extend_data = dash.no_update
+    if restarted:
+        figure = Patch()
+        figure['data'][0]['x'] = times
+        figure['data'][0]['y'] = heart_rates
+    elif samples:
+        extend_data = ({'x': [times], 'y': [heart_rates]}, [0], LIVE_VIEW_MAX_POINTS)
+    if reset_events:
+        events_children = [live_event_item(event) for event in events]
+    elif events:
+        events_children = Patch()
+        for event in events:
+            events_children.append(live_event_item(event))
+    else:
+        events_children = dash.no_update
+    return figure, extend_data, events_children, new_cursor
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from index import POTS_SCAN_BACKENDS, scan_pots_events
+from synthetic import synthetic_heart_rate
+
+SIZES = [100_000, 1_000_000]
+SETTINGS = (30, 5, 5, 60)
+
+
+def time_backend(backend, timestamps_ns, heart_rates, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = scan_pots_events(timestamps_ns, heart_rates, *SETTINGS, backend=backend)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    warm_ts, warm_hr = synthetic_heart_rate(1_000)
+    for backend in POTS_SCAN_BACKENDS:
+        scan_pots_events(warm_ts, warm_hr, *SETTINGS, backend=backend)
+    print(f"{'backend':<8} {'samples':>10} {'events':>7} {'seconds':>9} {'s / 1M samples':>15}")
+    for n_samples in SIZES:
+        timestamps_ns, heart_rates = synthetic_heart_rate(n_samples)
+        for backend in POTS_SCAN_BACKENDS:
+            seconds, result = time_backend(backend, timestamps_ns, heart_rates)
+            print(f"{backend:<8} {n_samples:>10} {len(result[0]):>7} {seconds:>9.3f} {seconds * 1_000_000 / n_samples:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
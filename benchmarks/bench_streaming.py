@@ -0,0 +1,27 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from index import StreamingPotsDetector
+from synthetic import synthetic_heart_rate
+
+THROUGHPUT_SAMPLES = 500_000
+SETTINGS = (30, 5, 5, 60)
+
+
+def main():
+    timestamps_ns, heart_rates = synthetic_heart_rate(THROUGHPUT_SAMPLES)
+    detector = StreamingPotsDetector(*SETTINGS)
+    events = []
+    start = time.perf_counter()
+    for timestamp_ns, heart_rate in zip(timestamps_ns.tolist(), heart_rates.tolist()):
+        events.extend(detector.push(timestamp_ns, heart_rate))
+    events.extend(detector.flush())
+    seconds = time.perf_counter() - start
+    print(f"streaming throughput: {THROUGHPUT_SAMPLES / seconds:,.0f} samples/s ({len(events)} events in {seconds:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import gc
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import index
+from index import day_prefetch_executor, export_full_report_as_pdf, memory_profile, update_analysis_outputs, update_graphs_on_row_select, upload_and_parse_xml
+from synthetic import SYNTHETIC_BLOCK_SAMPLES, synthetic_export_contents
+
+SCALES = [20_000, 100_000, 400_000]
+BASELINE_SAMPLES = SYNTHETIC_BLOCK_SAMPLES
+SETTINGS = (30, 5, 5, 60)
+HR_COLUMN_ITEMSIZE = np.dtype(np.float32).itemsize
+
+# Peak traced allocations allowed above a BASELINE_SAMPLES run of the same request, as a
+# multiple of the heart rate bytes added over that run. Subtracting the baseline removes
+# per-request constants (decode chunks, figure templates), so every scale is held to the
+# per-sample cost; the baseline is large enough to fill an upload decode chunk. Synthetic
+# series share their first days, so row selection sees the same day at every scale and any
+# growth there is cost that depends on the size of the dataset.
+STAGE_BUDGETS = {
+    'upload_and_parse_xml': {'parse_xml': 16, 'normalize_timestamps': 40},
+    'update_analysis_outputs': {'load_store': 8, 'detect_events': 24, 'summarize': 1, 'build_figures': 12},
+    'update_graphs_on_row_select': {'load_store': 1, 'select_day': 3, 'build_figures': 8, 'serialize_day': 1, 'prefetch': 1},
+    'export_full_report_as_pdf': {'load_store': 3, 'render_report': 12, 'deliver_report': 1},
+}
+REQUEST_BUDGETS = {
+    'upload_and_parse_xml': 50,
+    'update_analysis_outputs': 30,
+    'update_graphs_on_row_select': 10,
+    'export_full_report_as_pdf': 14,
+}
+# The full report is charged per event added over the baseline, in KiB, rather than per sample.
+# reportlab keeps every page's content until the document is saved and then assembles the whole
+# file in memory, so a few KiB per event is inherent; per-event figures or images held past
+# their page would show up as tens of KiB per event. Charts are drawn as vectors because raster
+# rendering needs a browser for kaleido.
+EVENT_BUDGET_REQUESTS = {'export_full_report_as_pdf'}
+EVENT_BUDGET_UNIT_BYTES = 1024
+
+
+@contextmanager
+def export_directory():
+    # Exports are measured on the streamed download path; the send_file fallback has to hold the
+    # whole file in the callback response.
+    directory = tempfile.mkdtemp(prefix='pots-budget-exports-')
+    previous, index.EXPORT_DIR = index.EXPORT_DIR, directory
+    try:
+        yield directory
+    finally:
+        index.EXPORT_DIR = previous
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def profiled_request(request_name):
+    # Cyclic garbage (plotly builds throwaway classes per call) would otherwise be charged to
+    # whichever request happens to run before a collection, so collection is paused while measuring.
+    gc.collect()
+    gc.disable()
+    try:
+        with memory_profile(request_name, top_sites=0) as report:
+            yield report
+    finally:
+        gc.enable()
+
+
+def profile_pipeline(n_samples, seed=0):
+    reports = []
+    contents = synthetic_export_contents(n_samples, seed)
+    with profiled_request('upload_and_parse_xml') as report:
+        _, store, _ = upload_and_parse_xml(contents, 'export.xml', None)
+    del contents
+    reports.append(report)
+    with profiled_request('update_analysis_outputs') as report:
+        events, summary, _, _ = update_analysis_outputs(store, *SETTINGS)
+    reports.append(report)
+    if summary:
+        with profiled_request('update_graphs_on_row_select') as report:
+            update_graphs_on_row_select([0], summary, store, events)
+        reports.append(report)
+        day_prefetch_executor.submit(lambda: None).result()
+        with export_directory(), profiled_request('export_full_report_as_pdf') as report:
+            export_full_report_as_pdf(1, store, events, summary, None, ['vector'])
+        report['events'] = len(events)
+        reports.append(report)
+    return reports
+
+
+def stage_baselines(report):
+    return {stage['stage']: stage for stage in report['stages']}
+
+
+def budget_unit_bytes(report, baseline, n_samples):
+    if report['request'] in EVENT_BUDGET_REQUESTS:
+        return max(report['events'] - baseline['events'], 1) * EVENT_BUDGET_UNIT_BYTES
+    return (n_samples - BASELINE_SAMPLES) * HR_COLUMN_ITEMSIZE
+
+
+def check_reports(reports, baseline_reports, n_samples, verbose=False):
+    baselines = {report['request']: report for report in baseline_reports}
+    failures = []
+    if len(reports) < len(REQUEST_BUDGETS):
+        failures.append(f"{n_samples}: no events detected in synthetic export")
+    for report in reports:
+        request = report['request']
+        baseline = baselines[request]
+        unit_bytes = budget_unit_bytes(report, baseline, n_samples)
+        growth = report['peak_traced_bytes'] - baseline['peak_traced_bytes']
+        if verbose:
+            print(f"  {request:<28} peak {growth / unit_bytes:8.1f}x")
+        if growth > REQUEST_BUDGETS[request] * unit_bytes:
+            failures.append(f"{n_samples} {request}: peak {growth / unit_bytes:.1f}x exceeds {REQUEST_BUDGETS[request]}x budget")
+        baseline_stages = stage_baselines(baseline)
+        for stage in report['stages']:
+            baseline_stage = baseline_stages.get(stage['stage'], {'peak_increase_bytes': 0, 'retained_bytes': 0})
+            growth = stage['peak_increase_bytes'] - baseline_stage['peak_increase_bytes']
+            if verbose:
+                retained = stage['retained_bytes'] - baseline_stage['retained_bytes']
+                print(f"    {stage['stage']:<26} peak {growth / unit_bytes:8.1f}x  retained {retained / unit_bytes:8.1f}x")
+            budget = STAGE_BUDGETS[request].get(stage['stage'])
+            if budget is not None and growth > budget * unit_bytes:
+                failures.append(f"{n_samples} {request}/{stage['stage']}: peak {growth / unit_bytes:.1f}x exceeds {budget}x budget")
+    return failures
+
+
+def measure_baseline():
+    # The first run pays for imports and the numba kernel. It uses another seed so the baseline
+    # does not hit that run's cached frame and day bundles.
+    profile_pipeline(BASELINE_SAMPLES, seed=1)
+    return profile_pipeline(BASELINE_SAMPLES)
+
+
+def main():
+    baseline_reports = measure_baseline()
+    failures = []
+    for n_samples in SCALES:
+        print(f"{n_samples} samples ({(n_samples - BASELINE_SAMPLES) * HR_COLUMN_ITEMSIZE} heart rate bytes over the baseline)")
+        failures += check_reports(profile_pipeline(n_samples), baseline_reports, n_samples, verbose=True)
+    if failures:
+        print("Memory budget failures:")
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+    print("All memory budgets met.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import base64
+import numpy as np
+import pandas as pd
+
+
+SYNTHETIC_BLOCK_SAMPLES = 10_000
+
+
+def synthetic_heart_rate(n_samples, seed=0, start='2024-01-01'):
+    # Blocks are seeded independently so a smaller series is always a prefix of a larger one.
+    gaps = []
+    heart_rates = []
+    for block in range(0, n_samples, SYNTHETIC_BLOCK_SAMPLES):
+        rng = np.random.default_rng([seed, block])
+        block_gaps = rng.choice([5, 10, 30, 60], size=SYNTHETIC_BLOCK_SAMPLES, p=[0.4, 0.3, 0.2, 0.1])
+        block_heart_rates = 65 + rng.normal(0, 1.5, SYNTHETIC_BLOCK_SAMPLES)
+        for burst_start in rng.integers(0, SYNTHETIC_BLOCK_SAMPLES - 200, SYNTHETIC_BLOCK_SAMPLES // 400):
+            block_heart_rates[burst_start:burst_start + rng.integers(5, 40)] += rng.choice([20, 35, 45])
+        gaps.append(block_gaps[:n_samples - block])
+        heart_rates.append(block_heart_rates[:n_samples - block])
+    gaps = np.concatenate(gaps) if gaps else np.empty(0, dtype=np.int64)
+    heart_rates = np.concatenate(heart_rates) if heart_rates else np.empty(0)
+    timestamps_ns = pd.Timestamp(start).value + np.cumsum(gaps).astype(np.int64) * 10**9
+    return timestamps_ns, np.round(heart_rates).astype(np.float32)
+
+
+def synthetic_heart_rate_frame(n_samples, seed=0, start='2024-01-01'):
+    utc_ns, heart_rates = synthetic_heart_rate(n_samples, seed, start)
+    return pd.DataFrame({
+        'timestamp': utc_ns.view('datetime64[ns]'),
+        'utc_ns': utc_ns,
+        'utc_offset_minutes': np.zeros(n_samples, dtype=np.int16),
+        'heart_rate': heart_rates
+    })
+
+
+def synthetic_export_contents(n_samples, seed=0, start='2024-01-01', utc_offset='-0500'):
+    utc_ns, heart_rates = synthetic_heart_rate(n_samples, seed, start)
+    sign = -1 if utc_offset[0] == '-' else 1
+    offset = pd.Timedelta(minutes=sign * (int(utc_offset[1:3]) * 60 + int(utc_offset[3:5])))
+    local = pd.to_datetime(utc_ns) + offset
+    records = '\n'.join(
+        f'<Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" unit="count/min" '
+        f'startDate="{timestamp:%Y-%m-%d %H:%M:%S} {utc_offset}" endDate="{timestamp:%Y-%m-%d %H:%M:%S} {utc_offset}" value="{int(value)}"/>'
+        for timestamp, value in zip(local, heart_rates)
+    )
+    xml = f'<?xml version="1.0" encoding="UTF-8"?>\n<HealthData locale="en_US">\n{records}\n</HealthData>\n'
+    return 'data:text/xml;base64,' + base64.b64encode(xml.encode('utf-8')).decode('ascii')
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from index import POTS_SCAN_BACKENDS, scan_pots_events
+from synthetic import synthetic_heart_rate
+
+SETTINGS = [(30, 5, 5, 60), (20, 3, 4, 30), (40, 10, 10, 120), (25, 2, 2.5, 15)]
+SEEDS = [0, 1, 2]
+N_SAMPLES = 50_000
+
+pytestmark = pytest.mark.skipif('numba' not in POTS_SCAN_BACKENDS, reason='numba is not installed')
+
+
+def noisy_series(seed, dtype):
+    utc_ns, heart_rates = synthetic_heart_rate(N_SAMPLES, seed)
+    rng = np.random.default_rng(seed)
+    duplicates = rng.random(N_SAMPLES) < 0.05
+    utc_ns = np.sort(utc_ns - duplicates * 5 * 10**9)
+    heart_rates = (heart_rates + rng.normal(0, 0.7, N_SAMPLES)).astype(dtype)
+    return utc_ns, heart_rates
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+@pytest.mark.parametrize('settings', SETTINGS)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_numba_backend_matches_numpy(seed, settings, dtype):
+    utc_ns, heart_rates = noisy_series(seed, dtype)
+    assert len(np.unique(utc_ns)) < len(utc_ns)
+    expected = scan_pots_events(utc_ns, heart_rates, *settings, backend='numpy')
+    actual = scan_pots_events(utc_ns, heart_rates, *settings, backend='numba')
+    assert len(expected[0]) > 0
+    for expected_array, actual_array in zip(expected, actual):
+        np.testing.assert_array_equal(actual_array, expected_array)
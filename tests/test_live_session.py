@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from index import LiveSession
+
+SETTINGS = (30, 5, 5, 60)
+START = datetime(2024, 3, 1, 8)
+
+
+def stream_lines(heart_rates, spacing_sec=10):
+    return ''.join(
+        f"{START + timedelta(seconds=i * spacing_sec):%Y-%m-%d %H:%M:%S} -0500,{heart_rate}\n"
+        for i, heart_rate in enumerate(heart_rates)
+    )
+
+
+def live_session(tmp_path, heart_rates, timeout=10):
+    source = tmp_path / 'live.txt'
+    source.write_text(stream_lines(heart_rates))
+    session = LiveSession(f'file:{source}')
+    deadline = time.monotonic() + timeout
+    while session.sample_seq < len(heart_rates):
+        if time.monotonic() > deadline:
+            pytest.fail(f"live session read {session.sample_seq} of {len(heart_rates)} samples")
+        time.sleep(0.05)
+    return session
+
+
+def test_stale_cursor_from_earlier_session_resets(tmp_path):
+    session = live_session(tmp_path, [60, 61, 62])
+    stale_cursor = {'session': 'earlier-session', 'sample': 50, 'event': 0, 'detector': 1}
+    samples, events, restarted, reset_events, cursor = session.read_since(stale_cursor, SETTINGS)
+    assert restarted and reset_events
+    assert [heart_rate for _, heart_rate in samples] == [60, 61, 62]
+    assert cursor == {'session': session.session_id, 'sample': 3, 'event': 0, 'detector': 1}
+
+
+def test_cursor_ahead_of_session_resets(tmp_path):
+    session = live_session(tmp_path, [60, 61, 62])
+    samples, _, restarted, _, _ = session.read_since({'session': session.session_id, 'sample': 50, 'event': 0, 'detector': 1}, SETTINGS)
+    assert restarted
+    assert len(samples) == 3
+
+
+def test_stale_cursor_with_matching_detector_id_resends_events(tmp_path):
+    # Rest for six minutes, then a sustained rise; the trailing samples close the sustained window.
+    session = live_session(tmp_path, [60] * 36 + [100] * 12 + [60] * 3)
+    _, events, _, _, cursor = session.read_since({}, SETTINGS)
+    assert len(events) == 1
+    stale_cursor = dict(cursor, session='earlier-session')
+    samples, events, restarted, reset_events, _ = session.read_since(stale_cursor, SETTINGS)
+    assert restarted and reset_events
+    assert len(samples) == 51
+    assert len(events) == 1
+
+
+def test_current_cursor_reads_only_new_data(tmp_path):
+    session = live_session(tmp_path, [60, 61, 62])
+    _, _, restarted, _, cursor = session.read_since({}, SETTINGS)
+    assert restarted
+    samples, events, restarted, reset_events, next_cursor = session.read_since(cursor, SETTINGS)
+    assert (samples, events, restarted, reset_events) == ([], [], False, False)
+    assert next_cursor == cursor
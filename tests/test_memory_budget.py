@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+import memory_budget
+
+
+@pytest.fixture(scope='module')
+def baseline_reports():
+    return memory_budget.measure_baseline()
+
+
+@pytest.mark.parametrize('n_samples', memory_budget.SCALES)
+def test_pipeline_memory_within_budget(baseline_reports, n_samples):
+    failures = memory_budget.check_reports(memory_budget.profile_pipeline(n_samples), baseline_reports, n_samples)
+    assert not failures, '\n'.join(failures)
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from index import StreamingPotsDetector, detect_pots_events
+from synthetic import synthetic_heart_rate
+
+SETTINGS = [(30, 5, 5, 60), (20, 3, 4, 30), (40, 10, 10, 120)]
+N_SAMPLES = 20_000
+# Small enough that the ring buffer wraps many times over a series.
+CAPACITY = 4_096
+
+
+def synthetic_frame(seed, utc_offset_minutes=None):
+    utc_ns, heart_rates = synthetic_heart_rate(N_SAMPLES, seed)
+    duplicates = np.random.default_rng(seed).random(N_SAMPLES) < 0.05
+    utc_ns = np.sort(utc_ns - duplicates * 5 * 10**9)
+    if utc_offset_minutes is None:
+        utc_offset_minutes = np.zeros(N_SAMPLES, dtype=np.int16)
+    return pd.DataFrame({
+        'timestamp': (utc_ns + utc_offset_minutes.astype(np.int64) * 60 * 10**9).view('datetime64[ns]'),
+        'utc_ns': utc_ns,
+        'utc_offset_minutes': utc_offset_minutes,
+        'heart_rate': heart_rates
+    })
+
+
+def stream_events(df, settings):
+    detector = StreamingPotsDetector(*settings, capacity=CAPACITY)
+    events = []
+    for utc_ns, heart_rate, offset_minutes in zip(df['utc_ns'].tolist(), df['heart_rate'].tolist(), df['utc_offset_minutes'].tolist()):
+        events.extend(detector.push(utc_ns, heart_rate, offset_minutes))
+    events.extend(detector.flush())
+    return events
+
+
+def increase_index(df, event):
+    return int(np.searchsorted(df['timestamp'].to_numpy(), np.datetime64(event['increase_time']), side='left'))
+
+
+@pytest.mark.parametrize('settings', SETTINGS)
+@pytest.mark.parametrize('seed', range(3))
+def test_streaming_matches_batch(seed, settings):
+    df = synthetic_frame(seed)
+    batch = detect_pots_events(df, *settings)
+    assert batch
+    assert stream_events(df, settings) == batch
+
+
+@pytest.mark.parametrize('settings', SETTINGS)
+def test_flush_resolves_open_sustained_window(settings):
+    df = synthetic_frame(0)
+    for event in detect_pots_events(df, *settings)[:3]:
+        truncated = df.iloc[:increase_index(df, event) + 1]
+        batch = detect_pots_events(truncated, *settings)
+        assert batch[-1]['increase_time'] == event['increase_time']
+        assert stream_events(truncated, settings) == batch
+
+
+def test_streaming_matches_batch_across_utc_offset_change():
+    settings = SETTINGS[0]
+    df = synthetic_frame(1)
+    events = detect_pots_events(df, *settings)
+    change = increase_index(df, events[len(events) // 2])
+    offsets = np.where(np.arange(N_SAMPLES) < change, -240, -300).astype(np.int16)
+    df = synthetic_frame(1, offsets)
+    batch = detect_pots_events(df, *settings)
+    assert any(event['utc_offset_minutes'] != event['increase_utc_offset_minutes'] for event in batch)
+    assert stream_events(df, settings) == batch
@@ -0,0 +1,134 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from index import build_heart_rate_store, day_frame, load_heart_rate_store, local_days, parse_apple_timestamps, update_analysis_outputs
+
+APPLE_FORMAT = '%Y-%m-%d %H:%M:%S %z'
+SETTINGS = (30, 5, 5, 60)
+SAMPLE_SPACING = timedelta(seconds=30)
+# New York falls back at 06:00 UTC on 2024-11-03, then the wearer flies to Tokyo.
+SERIES_START = datetime(2024, 11, 2, tzinfo=timezone.utc)
+SERIES_END = datetime(2024, 11, 7, tzinfo=timezone.utc)
+DST_END = datetime(2024, 11, 3, 6, tzinfo=timezone.utc)
+LANDING = datetime(2024, 11, 5, 10, tzinfo=timezone.utc)
+# One spike in the repeated hour after the fall back, one just before local midnight, which is
+# already the next day in UTC, and one just after local midnight in Tokyo, which is still the
+# previous day in UTC.
+SPIKES = ['2024-11-03 01:30:00 -0500', '2024-11-04 23:50:00 -0500', '2024-11-06 00:20:00 +0900']
+
+
+def apple_string(moment):
+    return moment.strftime(APPLE_FORMAT)
+
+
+def strptime_or_none(date_string):
+    try:
+        return datetime.strptime(date_string, APPLE_FORMAT)
+    except ValueError:
+        return None
+
+
+def assert_matches_strptime(date_strings):
+    utc_ns, offset_minutes, valid = parse_apple_timestamps(date_strings)
+    for i, date_string in enumerate(date_strings):
+        expected = strptime_or_none(date_string)
+        assert valid[i] == (expected is not None), date_string
+        if expected is not None:
+            assert utc_ns[i] == int(expected.timestamp()) * 10**9, date_string
+            assert offset_minutes[i] == expected.utcoffset() // timedelta(minutes=1), date_string
+
+
+def test_random_valid_strings_match_strptime():
+    rng = np.random.default_rng(0)
+    seconds = rng.integers(-2 * 10**9, 4 * 10**9, 2_000)
+    offsets = rng.integers(-14 * 60, 14 * 60 + 1, 2_000)
+    date_strings = [
+        apple_string(datetime(1970, 1, 1, tzinfo=timezone(timedelta(minutes=int(offset)))) + timedelta(seconds=int(second)))
+        for second, offset in zip(seconds, offsets)
+    ]
+    assert_matches_strptime(date_strings)
+
+
+def test_month_lengths_and_leap_years_match_strptime():
+    date_strings = [
+        f'{year:04d}-{month:02d}-{day:02d} 12:00:00 +0000'
+        for year in (1900, 1996, 2000, 2023, 2024, 2100)
+        for month in range(1, 13)
+        for day in (0, 1, 28, 29, 30, 31, 32)
+    ]
+    assert_matches_strptime(date_strings)
+
+
+@pytest.mark.parametrize('date_string', [
+    '2024-02-30 08:00:00 -0500',
+    '2023-02-29 08:00:00 -0500',
+    '1900-02-29 08:00:00 +0000',
+    '2024-04-31 08:00:00 +0000',
+    '2024-13-01 08:00:00 +0000',
+    '0000-01-01 08:00:00 +0000',
+    '2024-01-01 24:00:00 +0000',
+    '2024-01-01 23:60:00 +0000',
+    '2024-01-01 23:59:60 +0000',
+    '2024-01-01 08:00:00 +0075',
+    '2024-01-01 08:00:00 +2400',
+    '2024-01-01 08:00:00 *0100',
+    '2024/01/01 08:00:00 +0000',
+    '2024-01-01T08:00:00 +0000',
+    '2024-01-01 08:00:00 +0000 ',
+    '2024-01-01 08:00:00 +00000',
+    '2024-01-01 08:0a:00 +0000',
+    'not a timestamp',
+])
+def test_malformed_strings_are_rejected(date_string):
+    assert strptime_or_none(date_string) is None
+    _, _, valid = parse_apple_timestamps([date_string])
+    assert not valid[0]
+
+
+def test_bytes_input_matches_string_input():
+    date_strings = ['2024-02-29 23:59:59 +0530', '2024-02-30 00:00:00 +0000', '2024-11-03 01:30:00 -0400']
+    from_strings = parse_apple_timestamps(date_strings)
+    from_bytes = parse_apple_timestamps(''.join(date_strings).encode('ascii'))
+    for string_result, bytes_result in zip(from_strings, from_bytes):
+        np.testing.assert_array_equal(string_result, bytes_result)
+
+
+def travel_series():
+    rng = np.random.default_rng(0)
+    spike_starts = [datetime.strptime(spike, APPLE_FORMAT) for spike in SPIKES]
+    date_strings, heart_rates = [], []
+    moment = SERIES_START
+    while moment < SERIES_END:
+        offset = timedelta(hours=-4) if moment < DST_END else timedelta(hours=-5) if moment < LANDING else timedelta(hours=9)
+        date_strings.append(apple_string(moment.astimezone(timezone(offset))))
+        spiking = any(start <= moment < start + timedelta(minutes=3) for start in spike_starts)
+        heart_rates.append(100.0 if spiking else 60.0 + rng.uniform(-1, 1))
+        moment += SAMPLE_SPACING
+    return date_strings, heart_rates
+
+
+def test_day_frame_follows_local_days_across_dst_and_travel():
+    date_strings, heart_rates = travel_series()
+    df = load_heart_rate_store(build_heart_rate_store(date_strings, heart_rates))
+    assert df['timestamp'].is_monotonic_increasing is False
+    local_dates = np.array([date_string[:10] for date_string in date_strings])
+    utc_ns, _, _ = parse_apple_timestamps(date_strings)
+    for date in sorted(set(local_dates)) + ['2024-11-08']:
+        frame = day_frame(df, date)
+        np.testing.assert_array_equal(np.sort(frame['utc_ns'].to_numpy()), np.sort(utc_ns[local_dates == date]))
+        assert (local_days(frame) == np.datetime64(date)).all()
+
+
+def test_summary_buckets_events_by_local_start_day():
+    date_strings, heart_rates = travel_series()
+    store = build_heart_rate_store(date_strings, heart_rates)
+    serializable_events, summary, _, _ = update_analysis_outputs(store, *SETTINGS)
+    assert [row['Date'] for row in summary] == [spike[:10] for spike in SPIKES]
+    assert sum(row['Number of Events'] for row in summary) == len(serializable_events)
+    assert [event['start_time'][:10] for event in serializable_events] == [row['Date'] for row in summary for _ in range(row['Number of Events'])]